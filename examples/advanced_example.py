@@ -4,63 +4,132 @@ Playwright 高级功能演示
 包括网络拦截、移动设备模拟、多页面管理等高级特性
 """
 import asyncio
-import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from playwright.async_api import async_playwright
 
-async def network_interception_demo():
+try:
+    import orjson
+
+    def dumps_line(obj) -> bytes:
+        """序列化为一行 JSON（UTF-8 字节）"""
+        return orjson.dumps(obj) + b"\n"
+except ImportError:  # 未安装 orjson 时退回标准库
+    import json
+
+    def dumps_line(obj) -> bytes:
+        """序列化为一行 JSON（UTF-8 字节）"""
+        return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+# 默认无头模式运行，设置环境变量 PLAYWRIGHT_HEADFUL=1 可显示浏览器窗口便于调试
+HEADLESS = not os.environ.get("PLAYWRIGHT_HEADFUL")
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-features=VizDisplayCompositor",
+    "--memory-pressure-off",
+]
+
+# 高频的请求/响应日志经队列交给后台线程输出，回调中只做一次入队
+logger = logging.getLogger(__name__)
+
+# 日志处理器和监听器只创建一次，重复调用 main 时复用，避免同一条日志输出多次
+_LOG_LISTENER = None
+
+def setup_logging() -> QueueListener:
+    """配置基于队列的日志输出并启动监听器，返回需要在结束时停止的监听器"""
+    global _LOG_LISTENER
+    if _LOG_LISTENER is None:
+        log_queue = queue.Queue(-1)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(QueueHandler(log_queue))
+        # 未知的级别名称 getLevelName 返回字符串而不是数值，此时使用 INFO
+        level = logging.getLevelName(os.environ.get("LOG_LEVEL", "INFO").upper())
+        logger.setLevel(level if isinstance(level, int) else logging.INFO)
+        logger.propagate = False
+        _LOG_LISTENER = QueueListener(log_queue, stream_handler)
+    _LOG_LISTENER.start()
+    return _LOG_LISTENER
+
+# 同时打开的页面数上限，避免无限制并发导致内存耗尽
+MAX_CONCURRENT_PAGES = int(os.environ.get("PW_MAX_CONCURRENT", "4"))
+
+# 移动设备模拟使用的设备名称
+MOBILE_DEVICE = "iPhone 12"
+
+# 演示只关心页面结构，这些资源类型直接中止以减少带宽和加载时间
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+async def block_heavy_resources(route):
+    """中止非必要资源请求，其余请求正常放行"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def network_interception_demo(browser):
     """网络拦截演示"""
     print("🌐 网络拦截演示...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        page = await browser.new_page()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
         
-        # 拦截所有网络请求
-        intercepted_requests = []
+        # 拦截所有网络请求，逐条写入 JSONL 文件，不在内存中保留记录
+        request_log = open("logs/intercepted_requests.jsonl", "wb")
+        request_count = 0
         
         async def handle_request(request):
-            intercepted_requests.append({
+            nonlocal request_count
+            request_count += 1
+            request_log.write(dumps_line({
                 "url": request.url,
                 "method": request.method,
                 "headers": dict(request.headers)
-            })
-            print(f"🔍 拦截请求: {request.method} {request.url}")
-        
-        # 设置请求拦截
-        page.on("request", handle_request)
-        
-        # 拦截响应
-        async def handle_response(response):
-            if "api" in response.url:
-                print(f"📡 API响应: {response.status} {response.url}")
-        
-        page.on("response", handle_response)
-        
-        await page.goto("https://httpbin.org/")
-        await page.wait_for_load_state("networkidle")
-        
-        print(f"📊 总共拦截了 {len(intercepted_requests)} 个请求")
-        
-        # 保存拦截的请求信息
-        with open("logs/intercepted_requests.json", "w", encoding="utf-8") as f:
-            json.dump(intercepted_requests, f, indent=2, ensure_ascii=False)
-        
-        await browser.close()
-        print("✅ 网络拦截演示完成!")
+            }))
+            logger.info("🔍 拦截请求: %s %s", request.method, request.url)
+        
+        try:
+            # 设置请求拦截
+            page.on("request", handle_request)
+            
+            # 拦截响应
+            async def handle_response(response):
+                if "api" in response.url:
+                    logger.info("📡 API响应: %s %s", response.status, response.url)
+            
+            page.on("response", handle_response)
+            
+            # 中止图片、字体等非必要资源
+            await page.route("**/*", block_heavy_resources)
+            
+            await page.goto("https://httpbin.org/")
+            await page.wait_for_load_state("networkidle")
+        finally:
+            page.remove_listener("request", handle_request)
+            request_log.close()
+        
+        print(f"📊 总共拦截了 {request_count} 个请求")
+        
+    finally:
+        await context.close()
+    print("✅ 网络拦截演示完成!")
 
-async def mobile_simulation_demo():
+async def mobile_simulation_demo(browser, device):
     """移动设备模拟演示"""
     print("\n📱 移动设备模拟演示...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        
-        # 模拟iPhone 12
-        iphone_12 = p.devices["iPhone 12"]
-        context = await browser.new_context(**iphone_12)
+    # device 为 main 中预先取出的设备参数，可直接用于创建多个移动端上下文
+    context = await browser.new_context(**device)
+    try:
         page = await context.new_page()
         
-        print("📱 模拟 iPhone 12 访问网站...")
+        print(f"📱 模拟 {MOBILE_DEVICE} 访问网站...")
         await page.goto("https://m.baidu.com")
         await page.wait_for_load_state("networkidle")
         
@@ -77,60 +146,85 @@ async def mobile_simulation_demo():
         await search_input.tap()  # 使用tap而不是click
         await search_input.fill("移动端测试")
         
-        # 模拟滑动操作
-        await page.swipe(0, 300, 0, 100)  # 向上滑动
+        # 模拟滑动操作：Playwright 没有 swipe 接口，手指向上滑动 200 像素相当于页面向下滚动 200 像素
+        await page.evaluate("window.scrollBy(0, 200)")
         
         await page.screenshot(path="screenshots/mobile_interaction.png")
         
-        await browser.close()
-        print("✅ 移动设备模拟演示完成!")
+    finally:
+        await context.close()
+    print("✅ 移动设备模拟演示完成!")
 
-async def multi_page_demo():
+async def multi_page_demo(browser):
     """多页面管理演示"""
     print("\n🗂️  多页面管理演示...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
+    context = await browser.new_context()
+    try:
+        # 在上下文上注册一次拦截，所有页面共用
+        await context.route("**/*", block_heavy_resources)
         
         # 创建多个页面
-        pages = []
         urls = [
             "https://httpbin.org/",
             "https://httpbin.org/json",
             "https://httpbin.org/html"
         ]
         
-        for i, url in enumerate(urls):
-            page = await context.new_page()
-            pages.append(page)
-            await page.goto(url)
-            print(f"📄 页面 {i+1} 已加载: {url}")
-        
-        # 在所有页面上执行操作
-        for i, page in enumerate(pages):
-            title = await page.title()
-            await page.screenshot(path=f"screenshots/page_{i+1}.png")
-            print(f"📸 页面 {i+1} 截图已保存, 标题: {title}")
+        # 并发数受信号量限制：每个页面从打开到关闭的整个过程都持有信号量，
+        # 保留的页面在演示结束关闭时才释放，同时存在的页面数不超过 MAX_CONCURRENT_PAGES
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+        
+        async def visit_one(i, url, keep_open=False):
+            await semaphore.acquire()
+            page = None
+            kept = False
+            try:
+                page = await context.new_page()
+                await page.goto(url)
+                print(f"📄 页面 {i+1} 已加载: {url}")
+                title, _ = await asyncio.gather(
+                    page.title(),
+                    page.screenshot(path=f"screenshots/page_{i+1}.png")
+                )
+                print(f"📸 页面 {i+1} 截图已保存, 标题: {title}")
+                kept = keep_open
+                return page if kept else None
+            finally:
+                # 出错时也关闭页面并释放名额；需要保留的页面成功后继续占用名额，由调用方关闭后释放
+                if not kept:
+                    if page is not None:
+                        await page.close()
+                        print(f"❌ 关闭页面 {i+1}")
+                    semaphore.release()
+        
+        # 并发加载、截图并关闭各页面；与逐个打开时全部保留不同，这里只保留第一个页面用于后续切换演示，
+        # 其余页面截图后立即关闭，以免超过页面数上限。
+        # 保留的页面最后排队获取名额，上限为 1 时也不会因它一直占用名额而使其余页面无法打开
+        *_, first_page = await asyncio.gather(
+            *(visit_one(i, url) for i, url in enumerate(urls) if i > 0),
+            visit_one(0, urls[0], keep_open=True)
+        )
         
         # 页面间切换
-        await pages[0].bring_to_front()
+        await first_page.bring_to_front()
         print("🔄 切换到第一个页面")
         
-        # 关闭特定页面
-        await pages[1].close()
-        print("❌ 关闭第二个页面")
+        await first_page.close()
+        semaphore.release()
+        print("❌ 关闭页面 1")
         
-        await browser.close()
-        print("✅ 多页面管理演示完成!")
+    finally:
+        await context.close()
+    print("✅ 多页面管理演示完成!")
 
-async def javascript_execution_demo():
+async def javascript_execution_demo(browser):
     """JavaScript执行演示"""
     print("\n🔧 JavaScript执行演示...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        page = await browser.new_page()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
         
         await page.goto("https://httpbin.org/")
         
@@ -168,16 +262,17 @@ async def javascript_execution_demo():
         await page.screenshot(path="screenshots/js_modified.png")
         print("📸 JavaScript修改后的页面截图已保存")
         
-        await browser.close()
-        print("✅ JavaScript执行演示完成!")
+    finally:
+        await context.close()
+    print("✅ JavaScript执行演示完成!")
 
-async def wait_strategies_demo():
+async def wait_strategies_demo(browser):
     """等待策略演示"""
     print("\n⏳ 等待策略演示...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        page = await browser.new_page()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
         
         await page.goto("https://httpbin.org/delay/2")  # 延迟2秒的页面
         
@@ -197,20 +292,37 @@ async def wait_strategies_demo():
         await page.wait_for_timeout(1000)  # 等待1秒
         
         print("✅ 所有等待策略演示完成!")
-        
-        await browser.close()
+    finally:
+        await context.close()
 
-async def main():
-    """主函数"""
-    import os
+def ensure_output_dirs():
+    """创建输出目录；每次都检查，目录在两次运行之间被删除时也能重新创建"""
     os.makedirs("screenshots", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
+
+async def main():
+    """主函数"""
+    ensure_output_dirs()
+    log_listener = setup_logging()
     
-    await network_interception_demo()
-    await mobile_simulation_demo()
-    await multi_page_demo()
-    await javascript_execution_demo()
-    await wait_strategies_demo()
+    # 只启动一个浏览器，各演示使用独立的上下文，互不依赖，并发执行
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=HEADLESS, args=LAUNCH_ARGS)
+            # 设备参数只查找一次，传给需要的演示
+            mobile_device = p.devices[MOBILE_DEVICE]
+            try:
+                await asyncio.gather(
+                    network_interception_demo(browser),
+                    mobile_simulation_demo(browser, mobile_device),
+                    multi_page_demo(browser),
+                    javascript_execution_demo(browser),
+                    wait_strategies_demo(browser),
+                )
+            finally:
+                await browser.close()
+    finally:
+        log_listener.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
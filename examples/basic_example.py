@@ -4,16 +4,52 @@ Playwright 基础示例
 演示基本的浏览器操作和页面交互
 """
 import asyncio
+import os
 from playwright.async_api import async_playwright
 
-async def basic_browser_operations():
+# 默认无头模式运行，设置环境变量 PLAYWRIGHT_HEADFUL=1 可显示浏览器窗口便于调试
+HEADLESS = not os.environ.get("PLAYWRIGHT_HEADFUL")
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-features=VizDisplayCompositor",
+    "--memory-pressure-off",
+]
+
+# 在页面内一次性收集链接的文本、地址、下载属性及可见/可用状态
+LINK_INFO_JS = """
+    els => els.map(el => ({
+        kind: el.textContent.includes('空白') ? 'blank' : 'sample',
+        text: el.textContent.trim(),
+        href: el.getAttribute('href'),
+        download: el.getAttribute('download'),
+        visible: !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length),
+        enabled: !el.disabled && el.getAttribute('aria-disabled') !== 'true'
+    }))
+"""
+
+def print_link_info(label, links_data):
+    """打印链接的文本、地址、下载属性及可点击性"""
+    for i, info in enumerate(links_data):
+        print(f"\n🔗 {label}链接 {i+1}:")
+        print(f"   文本: {info['text']}")
+        print(f"   是否可见: {info['visible']}")
+        print(f"   是否可用: {info['enabled']}")
+        print(f"   链接地址: {info['href']}")
+        print(f"   下载属性: {info['download']}")
+        
+        if info['visible'] and info['enabled']:
+            print("   ✅ 此链接可以点击")
+        else:
+            print("   ❌ 此链接无法点击")
+
+async def basic_browser_operations(browser):
     """基础浏览器操作演示"""
-    print("🌐 启动浏览器...")
-    
-    async with async_playwright() as p:
-        # 启动浏览器（可以选择 chromium, firefox, webkit）
-        browser = await p.chromium.launch(headless=False)  # headless=False 显示浏览器窗口
-        page = await browser.new_page()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
         
         print("📖 访问百度首页...")
         # await page.goto("https://www.baidu.com")
@@ -34,7 +70,6 @@ async def basic_browser_operations():
                 
         except Exception as e:
             print(f"❌ 页面加载失败: {e}")
-            await browser.close()
             return
         
         # 等待页面完全加载并稳定
@@ -43,12 +78,12 @@ async def basic_browser_operations():
             await page.wait_for_load_state("domcontentloaded", timeout=10000)
             print("✅ DOM内容加载完成")
             
-            # 等待网络空闲（可选）
+            # 等待后续要用到的目标文本出现，无需等待网络空闲
             try:
-                await page.wait_for_load_state("networkidle", timeout=5000)
-                print("✅ 网络活动已稳定")
+                await page.wait_for_selector("text=体检合格证明", timeout=10000)
+                print("✅ 目标内容已出现")
             except:
-                print("⚠️  网络活动检测超时，继续执行")
+                print("⚠️  等待目标内容超时，继续执行")
                 
         except Exception as e:
             print(f"⚠️  等待页面加载时出错: {e}")
@@ -70,9 +105,6 @@ async def basic_browser_operations():
         
         # 检查页面内容是否加载完成
         try:
-            # 等待页面主要内容出现
-            await page.wait_for_timeout(2000)  # 额外等待2秒确保页面稳定
-            
             # 获取一些基本信息
             url = page.url
             print(f"🌐 当前页面URL: {url}")
@@ -81,9 +113,6 @@ async def basic_browser_operations():
             print(f"⚠️  获取页面信息时出错: {e}")
         
         try:
-            # 等待页面内容加载
-            await page.wait_for_load_state("domcontentloaded")
-            
             # 查找包含"体检合格证明"文本的元素
             health_cert_elements = page.locator("text=体检合格证明")
             health_cert_count = await health_cert_elements.count()
@@ -97,80 +126,24 @@ async def basic_browser_operations():
                 link_count = await all_links.count()
                 print(f"📊 页面中共有 {link_count} 个链接")
                 
-                # 检查包含特定文本的链接
-                blank_form_links = page.locator("a:text('空白表格')")
-                sample_form_links = page.locator("a:text('示例样表')")
-                
-                blank_form_count = await blank_form_links.count()
-                sample_form_count = await sample_form_links.count()
+                # 用一个定位器和一次 evaluate_all 取回两类链接的属性
+                form_links = page.locator("a:text('空白表格'), a:text('示例样表')")
+                links_data = await form_links.evaluate_all(LINK_INFO_JS)
+                blank_form_data = [info for info in links_data if info['kind'] == 'blank']
+                sample_form_data = [info for info in links_data if info['kind'] == 'sample']
                 
-                print(f"📋 找到 {blank_form_count} 个'空白表格'链接")
-                print(f"📄 找到 {sample_form_count} 个'示例样表'链接")
+                print(f"📋 找到 {len(blank_form_data)} 个'空白表格'链接")
+                print(f"📄 找到 {len(sample_form_data)} 个'示例样表'链接")
                 
                 # 检查每个链接的可点击性和下载属性
-                for i in range(blank_form_count):
-                    link = blank_form_links.nth(i)
-                    
-                    # 检查链接是否可见
-                    is_visible = await link.is_visible()
-                    # 检查链接是否可用
-                    is_enabled = await link.is_enabled()
-                    # 获取链接文本
-                    text = await link.text_content()
-                    # 获取链接地址
-                    href = await link.get_attribute("href")
-                    # 检查是否有download属性
-                    download_attr = await link.get_attribute("download")
-                    
-                    print(f"\n🔗 空白表格链接 {i+1}:")
-                    print(f"   文本: {text}")
-                    print(f"   是否可见: {is_visible}")
-                    print(f"   是否可用: {is_enabled}")
-                    print(f"   链接地址: {href}")
-                    print(f"   下载属性: {download_attr}")
-                    
-                    if is_visible and is_enabled:
-                        print("   ✅ 此链接可以点击")
-                        # 可以尝试点击下载（注释掉，需要时取消注释）
-                        # await link.click()
-                        # print("   📥 已尝试点击下载")
-                    else:
-                        print("   ❌ 此链接无法点击")
-                
-                for i in range(sample_form_count):
-                    link = sample_form_links.nth(i)
-                    
-                    # 检查链接是否可见
-                    is_visible = await link.is_visible()
-                    # 检查链接是否可用
-                    is_enabled = await link.is_enabled()
-                    # 获取链接文本
-                    text = await link.text_content()
-                    # 获取链接地址
-                    href = await link.get_attribute("href")
-                    # 检查是否有download属性
-                    download_attr = await link.get_attribute("download")
-                    
-                    print(f"\n🔗 示例样表链接 {i+1}:")
-                    print(f"   文本: {text}")
-                    print(f"   是否可见: {is_visible}")
-                    print(f"   是否可用: {is_enabled}")
-                    print(f"   链接地址: {href}")
-                    print(f"   下载属性: {download_attr}")
-                    
-                    if is_visible and is_enabled:
-                        print("   ✅ 此链接可以点击")
-                        # 可以尝试点击下载（注释掉，需要时取消注释）
-                        # await link.click()
-                        # print("   📥 已尝试点击下载")
-                    else:
-                        print("   ❌ 此链接无法点击")
+                print_link_info("空白表格", blank_form_data)
+                print_link_info("示例样表", sample_form_data)
                         
             else:
                 print("❌ 未找到包含'体检合格证明'的元素")
-                # 如果找不到，可以打印页面内容帮助调试
-                page_text = await page.text_content("body")
-                if "体检合格证明" in page_text:
+                # 如果找不到，在页面内检查文本是否存在，只回传一个布尔值
+                has_text = await page.evaluate("() => document.body.innerText.includes('体检合格证明')")
+                if has_text:
                     print("⚠️  页面文本中包含'体检合格证明'，但可能结构不同")
                 else:
                     print("❌ 页面文本中不包含'体检合格证明'")
@@ -205,58 +178,74 @@ async def basic_browser_operations():
         # await page.screenshot(path="screenshots/search_results.png")
         # print("📸 已保存搜索结果截图")
         
-        await browser.close()
         print("✅ 基础示例执行完成!")
+    finally:
+        await context.close()
 
-async def form_interaction_demo():
+async def form_interaction_demo(browser):
     """表单交互演示"""
     print("\n📝 表单交互演示...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        page = await browser.new_page()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
         
         # 访问一个测试表单网站
         await page.goto("https://httpbin.org/forms/post")
         
-        # 填写表单
+        # 依次填写表单、选择下拉菜单和复选框：fill 会先聚焦元素再输入，
+        # 焦点是整个页面共享的，并发填写可能把文字输入到错误的字段
         await page.fill("input[name='custname']", "张三")
         await page.fill("input[name='custtel']", "13800138000")
         await page.fill("input[name='custemail']", "zhangsan@example.com")
         await page.fill("textarea[name='comments']", "这是一个 Playwright 测试")
-        
-        # 选择下拉菜单
         await page.select_option("select[name='size']", "medium")
-        
-        # 选择单选按钮
         await page.check("input[value='bacon']")
         
         print("📝 表单已填写完成")
         await page.screenshot(path="screenshots/form_filled.png")
         
-        # 提交表单
-        await page.click("input[type='submit']")
-        
-        # 等待响应页面
-        await page.wait_for_load_state("networkidle")
+        # 提交表单：等待 POST 响应，并等待结果页面的文档加载完成后再截图，无需等待页面网络空闲
+        async with page.expect_navigation(wait_until="domcontentloaded"):
+            async with page.expect_response("**/post") as response_info:
+                await page.click("input[type='submit']")
+        response = await response_info.value
         
-        # 获取提交结果
-        result_text = await page.text_content("body")
-        print("📤 表单提交结果已获取")
+        # 直接从响应中获取提交结果
+        result_text = await response.text()
+        print(f"📤 表单提交结果已获取 ({len(result_text)} 字符)")
         
         await page.screenshot(path="screenshots/form_submitted.png")
         
-        await browser.close()
         print("✅ 表单交互演示完成!")
+    finally:
+        await context.close()
+
+# 输出目录只需创建一次，重复调用 main 时跳过
+_DIRS_READY = False
+
+def ensure_output_dirs():
+    """创建输出目录"""
+    global _DIRS_READY
+    if _DIRS_READY:
+        return
+    os.makedirs("screenshots", exist_ok=True)
+    _DIRS_READY = True
 
 async def main():
     """主函数"""
-    # 创建截图目录
-    import os
-    os.makedirs("screenshots", exist_ok=True)
+    ensure_output_dirs()
     
-    await basic_browser_operations()
-    # await form_interaction_demo()
+    # 只启动一次 Playwright 和浏览器，各演示使用独立的上下文
+    print("🌐 启动浏览器...")
+    async with async_playwright() as p:
+        # 启动浏览器（可以选择 chromium, firefox, webkit）
+        browser = await p.chromium.launch(headless=HEADLESS, args=LAUNCH_ARGS)
+        try:
+            await basic_browser_operations(browser)
+            # await form_interaction_demo(browser)
+        finally:
+            await browser.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -14,25 +14,109 @@ Playwright 批量测试脚本
     python batch_runner.py input_file.xlsx
 """
 import asyncio
+import csv
+import heapq
+import itertools
+import logging
 import os
 import sys
 import pandas as pd
 from datetime import datetime
+import xlsxwriter
 from pathlib import Path
-from playwright.async_api import async_playwright, expect
+from playwright.async_api import async_playwright
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
 import argparse
 from document_validator import DocumentValidator, ValidationResult
 
+# 取回候选链接的 href/onclick/class/target 属性，row 为链接所在行的序号（按行首次出现的顺序编号）
+LINK_INFO_JS = """
+    links => {
+        const rows = new Map();
+        return links.map(a => {
+            const row = a.closest('tr');
+            if (!rows.has(row)) rows.set(row, rows.size);
+            return {
+                href: a.getAttribute('href'),
+                onclick: a.getAttribute('onclick'),
+                cls: a.className || '',
+                target: a.getAttribute('target'),
+                row: rows.get(row)
+            };
+        });
+    }
+"""
+
+# 逐行的步骤信息走日志，默认只输出警告，--verbose 时输出全部细节；整体进度由进度条显示
+logger = logging.getLogger("batch")
+
+# 默认无头模式运行，设置环境变量 PLAYWRIGHT_HEADFUL=1 可显示浏览器窗口便于调试
+HEADLESS = not os.environ.get("PLAYWRIGHT_HEADFUL")
+LAUNCH_ARGS = ["--disable-dev-shm-usage", "--no-sandbox"]
+
+# 批量测试只关心页面结构和下载脚本，这些资源类型直接中止以加快页面加载
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+async def block_heavy_resources(route):
+    """中止非必要资源请求，文档、脚本、XHR 等请求正常放行"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+# 写入结果的错误信息最大长度；Playwright 的错误信息常附带完整的调用日志，可达数 KB
+MAX_ERROR_LENGTH = 200
+
+def format_error(e: BaseException) -> str:
+    """将异常格式化为单行简短信息：异常类型加错误信息的第一行"""
+    lines = str(e).strip().splitlines()
+    first_line = lines[0] if lines else ""
+    return f"{type(e).__name__}: {first_line[:MAX_ERROR_LENGTH]}"
+
+# 执行测试必需的输入列
+REQUIRED_COLUMNS = ['url', '材料名称', '元素名称']
+
+# 执行结果列
+RESULT_COLUMNS = ['执行时间', '执行结果', '文件格式']
+
+# 文档校验结果列
+VALIDATION_COLUMNS = [
+    '两表格内容样式是否一致',
+    '材料名称和空白表格主旨是否相符',
+    '材料名称和示例样表主旨是否相符',
+    '空白表格无示例',
+    '示例样表包含填写示例',
+    '示例样表信息是否打码',
+]
+
 class BatchTestRunner:
     """批量测试运行器"""
     
-    def __init__(self, input_file: str, output_file: str = None, openai_api_key: str = None, openai_base_url: str = None):
+    def __init__(self, input_file: str, output_file: str = None, openai_api_key: str = None, openai_base_url: str = None,
+                 concurrency: int = 4):
         self.input_file = input_file
         self.output_file = output_file or self._generate_output_filename()
+        self.concurrency = max(1, concurrency)
+        # 文件名使用本次运行的时间戳加递增序号，同一秒内的并发下载也不会重名
+        self._run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._file_counter = itertools.count(1)
         self.download_dir = "downloads"
         self.screenshots_dir = "screenshots"
         self._ensure_directories()
         
+        # 进度日志：每完成一行即追加写入 CSV，中途崩溃时已完成的结果不会丢失
+        root, _ = os.path.splitext(self.output_file)
+        self.progress_file = f"{root}.progress.csv"
+        self._progress_log = None
+        self._progress_writer = None
+        self._progress_bar = None
+        self._input_rows = []
+        # 并发下各行乱序完成：先放入按位置排序的最小堆，连续的前缀就绪后再按输入顺序写出
+        self._pending_rows = []
+        self._next_position = 0
+        
         # 初始化文档校验器
         self.document_validator = None
         if openai_api_key:
@@ -61,13 +145,38 @@ class BatchTestRunner:
         os.makedirs(self.download_dir, exist_ok=True)
         os.makedirs(self.screenshots_dir, exist_ok=True)
         
-    async def test_single_download_link(self, page, url: str, material_name: str, element_name: str) -> tuple:
+    async def _navigate(self, page, url: str):
         """
-        测试单个下载链接
+        打开目标页面，同一URL下的多行测试共用一次导航
         
         Args:
             page: Playwright页面对象
             url: 目标页面URL
+            
+        Returns:
+            tuple | None: 访问失败时返回 (status, message, file_path, file_type)，成功时为 None
+        """
+        logger.debug("🚀 正在访问: %s", url)
+        try:
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        except PlaywrightError as e:
+            return ("失败", f"页面访问出错: {format_error(e)}", "", "")
+        
+        if not response or not response.ok:
+            return ("失败", f"页面访问失败，状态码: {response.status if response else '无响应'}", "", "")
+        return None
+    
+    @staticmethod
+    def _is_download_link(info: dict) -> bool:
+        """链接有href、onclick或特定class时视为有效的下载链接"""
+        return bool(info["href"] or info["onclick"] or "kbbg" in info["cls"] or "download" in info["cls"].lower())
+    
+    async def _find_and_download(self, page, material_name: str, element_name: str) -> tuple:
+        """
+        在已加载的页面上定位目标行并下载链接
+        
+        Args:
+            page: 已导航到目标URL的Playwright页面对象
             material_name: 材料名称（用于定位行）
             element_name: 元素名称（下载链接文本）
             
@@ -80,150 +189,100 @@ class BatchTestRunner:
         """
         start_time = datetime.now()
         
+        # 候选链接定位器只构建一次，就绪等待与后续定位共用；名称以参数传入，无需拼接和转义选择器字符串
+        # 一个组合定位器直接得到“包含材料名称的行中、文本包含元素名称的链接”
+        candidates = page.locator("tr", has_text=material_name).locator("a", has_text=element_name)
+        
         try:
-            # --- 1. 页面导航 ---
-            print(f"🚀 正在访问: {url}")
-            response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            
-            if not response or not response.ok:
-                return ("失败", f"页面访问失败，状态码: {response.status if response else '无响应'}", "", "")
-            
-            # 等待网络空闲，确保页面内容稳定
-            print("⏳ 等待页面完全加载稳定...")
-            try:
-                await page.wait_for_load_state("networkidle", timeout=15000)
-                print("✅ 页面已稳定")
-            except Exception as e:
-                print(f"⚠️ 等待页面稳定超时: {e}")
-                # 即使超时也继续执行，因为有些页面可能一直有后台请求
+            # --- 1. 等待页面就绪 ---
+            # 目标链接出现或网络空闲，先到者即可继续；有些页面一直有后台请求，网络空闲可能很晚才到
+            # 同一页面上的后续行目标链接通常已存在，这里会立即返回
+            logger.debug("⏳ 等待目标链接出现或页面网络空闲...")
+            if await self._first_success(
+                candidates.first.wait_for(state="attached", timeout=15000),
+                page.wait_for_load_state("networkidle", timeout=15000),
+            ):
+                logger.debug("✅ 页面已就绪")
+            else:
+                # 即使超时也继续执行，由后续定位逻辑给出具体结果
+                logger.debug("⚠️ 等待页面就绪超时")
                 
-            # --- 2. 定位目标行 ---
-            print(f"🔍 正在定位材料: {material_name}")
-            
-            # 改进的定位策略：直接查找包含下载链接的行
-            target_row = None
-            found = False
+            # --- 2. 定位下载链接 ---
+            logger.debug("🔍 正在定位材料: %s / 链接: %s", material_name, element_name)
             
-            # 方案1：查找同时包含材料名称和下载链接的行
+            # 一次 evaluate_all 取回所有候选链接的属性，避免逐行逐链接往返
             try:
-                potential_rows = page.locator(f"tr:has-text('{material_name}')")
-                row_count = await potential_rows.count()
-                print(f"📋 找到 {row_count} 个包含'{material_name}'的行")
-                
-                # 遍历每一行，找到包含下载链接的那一行
-                for i in range(row_count):
-                    row = potential_rows.nth(i)
-                    # 检查这一行是否包含目标下载链接
-                    link_count = await row.locator(f"a:text('{element_name}')").count()
-                    
-                    if link_count > 0:
-                        # 进一步验证这是正确的行（检查链接是否可点击）
-                        links = row.locator(f"a:text('{element_name}')")
-                        
-                        # 检查链接的属性，确保它们是下载链接
-                        first_link = links.first
-                        href = await first_link.get_attribute("href")
-                        onclick = await first_link.get_attribute("onclick")
-                        class_name = await first_link.get_attribute("class")
-                        
-                        # 如果有href、onclick或特定class，说明是有效的下载链接
-                        if href or onclick or (class_name and ("kbbg" in class_name or "download" in class_name.lower())):
-                            target_row = row
-                            found = True
-                            print(f"✅ 找到有效的下载链接行 (第 {i+1} 行)")
-                            break
-                        else:
-                            print(f"⏭️  跳过第 {i+1} 行 (无有效下载链接)")
-                
-                if not found:
-                    # 备用方案：如果上面的严格检查没找到，选择第一个包含链接的行
-                    print("🔄 使用备用方案：选择第一个包含链接文本的行")
-                    for i in range(row_count):
-                        row = potential_rows.nth(i)
-                        link_count = await row.locator(f"a:text('{element_name}')").count()
-                        if link_count > 0:
-                            target_row = row
-                            found = True
-                            print(f"⚠️  选择第 {i+1} 行作为目标行")
-                            break
-                            
-            except Exception as e:
-                print(f"⚠️  定位过程中出现异常: {e}")
+                link_infos = await candidates.evaluate_all(LINK_INFO_JS)
+            except PlaywrightError as e:
+                logger.warning("⚠️  定位过程中出现异常: %s", format_error(e))
+                link_infos = []
+            logger.debug("📋 找到 %d 个候选链接", len(link_infos))
             
-            if not found or target_row is None:
+            if not link_infos:
                 return ("失败", f"未找到包含'{material_name}'和'{element_name}'的有效行", "", "")
             
-            # 等待行可见
-            try:
-                await expect(target_row).to_be_visible(timeout=10000)
-                print("✅ 目标行已确认可见")
-            except Exception as e:
-                return ("失败", f"目标行不可见: {e}", "", "")
+            # 候选链接按所在行分组，先选行再在行内选链接
+            row_links = {}
+            for i, info in enumerate(link_infos):
+                row_links.setdefault(info["row"], []).append(i)
             
-            # --- 3. 定位下载链接 ---
-            print(f"🔗 正在定位下载链接: {element_name}")
+            # 行的第一个链接有href、onclick或特定class时，说明该行有有效的下载链接，选择第一个这样的行
+            target_row = next(
+                (indexes for indexes in row_links.values() if self._is_download_link(link_infos[indexes[0]])),
+                None
+            )
+            if target_row is not None:
+                logger.debug("✅ 找到有效的下载链接行")
+            else:
+                # 备用方案：没有通过严格检查的行时，选择第一个包含链接文本的行
+                target_row = next(iter(row_links.values()))
+                logger.debug("🔄 使用备用方案：选择第一个包含链接文本的行")
             
-            # 查找目标链接
-            target_links = target_row.locator(f"a:text('{element_name}')")
-            link_count = await target_links.count()
+            # 行内有多个链接时优先选择 kbbg 类的链接，否则选择第一个
+            chosen = next((i for i in target_row if "kbbg" in link_infos[i]["cls"].split()), target_row[0])
+            logger.debug("✅ 选择第 %d 个候选链接", chosen + 1)
             
-            if link_count == 0:
-                return ("失败", f"在目标行中未找到'{element_name}'链接", "", "")
+            link_info = link_infos[chosen]
             
-            # 选择合适的链接
-            if link_count > 1:
-                # 优先选择特定class的链接
-                preferred_link = target_row.locator(f"a.kbbg:text('{element_name}')")
-                if await preferred_link.count() > 0:
-                    download_link = preferred_link
-                else:
-                    download_link = target_links.first
-            else:
-                download_link = target_links
-                
-            # 确认链接可见
-            await expect(download_link).to_be_visible(timeout=5000)
+            # 选中的链接只解析一次为元素句柄，可见性检查和点击都复用该句柄，不再按选择器重复查询
+            # 句柄在页面下次导航时随之失效，无需单独释放
+            try:
+                download_link = await candidates.nth(chosen).element_handle(timeout=10000)
+                await download_link.wait_for_element_state("visible", timeout=10000)
+                logger.debug("✅ 下载链接已确认可见")
+            except PlaywrightError as e:
+                return ("失败", f"目标链接不可见: {format_error(e)}", "", "")
             
-            # --- 4. 执行下载 ---
-            print(f"📥 准备下载: {element_name}")
+            # --- 3. 执行下载 ---
+            logger.debug("📥 准备下载: %s", element_name)
             
-            # 检查链接属性
-            href = await download_link.get_attribute("href")
-            onclick = await download_link.get_attribute("onclick")
-            target = await download_link.get_attribute("target")
+            # 链接属性已随候选一并取回
+            href = link_info["href"]
+            onclick = link_info["onclick"]
+            target = link_info["target"]
             
-            print(f"🔍 链接信息: href={href is not None}, onclick={onclick is not None}, target={target}")
+            logger.debug("🔍 链接信息: href=%s, onclick=%s, target=%s", href is not None, onclick is not None, target)
             
             try:
                 # 只有一种策略：必须成功触发下载
-                print("🎯 尝试监听并触发下载...")
+                logger.debug("🎯 尝试监听并触发下载...")
                 
                 # 如果链接在新窗口打开，需要处理新页面
                 if target == "_blank":
-                    print("🔗 检测到新窗口链接，将在新窗口中处理下载")
+                    logger.debug("🔗 检测到新窗口链接，将在新窗口中处理下载")
                     async with page.context.expect_page() as new_page_info:
                         await download_link.click()
                     
                     new_page = await new_page_info.value
                     
-                    # 等待新页面稳定
-                    print("⏳ 等待新窗口页面稳定...")
+                    # 新窗口打开后通常会自动触发下载，直接等待下载事件，
+                    # 不再先等待网络空闲（下载可能在等待期间就已触发而被错过）
+                    logger.debug("⏳ 等待新窗口中的下载...")
                     try:
-                        await new_page.wait_for_load_state("networkidle", timeout=10000)
-                        print("✅ 新窗口页面已稳定")
-                    except Exception as e:
-                        print(f"⚠️ 新窗口页面稳定等待超时: {e}")
-                    
-                    # 在新页面中等待下载事件
-                    async with new_page.expect_download(timeout=10000) as download_info:
-                        # 有些页面在新窗口打开后会自动触发下载，无需再次点击
-                        # 如果需要进一步操作才能下载，需要在这里添加
-                        print("⏳ 等待新窗口中的下载...")
-                        
-                    download = await download_info.value
-                    
-                    # 下载完成后关闭新页面
-                    await new_page.close()
+                        download = await new_page.wait_for_event("download", timeout=20000)
+                    finally:
+                        # 下载完成后关闭新页面
+                        await new_page.close()
                     
                 else:
                     # 在当前页面处理下载
@@ -234,72 +293,292 @@ class BatchTestRunner:
                 
                 # --- 下载成功处理 ---
                 # 构建文件保存路径
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{timestamp}_{download.suggested_filename}"
+                filename = f"{self._run_timestamp}_{next(self._file_counter):05d}_{download.suggested_filename}"
                 file_path = os.path.join(self.download_dir, filename)
                 
                 # 保存文件
                 await download.save_as(file_path)
                 
                 # --- 判断文件类型 ---
-                # 从文件名提取扩展名并转换为小写
-                _, file_extension = os.path.splitext(download.suggested_filename)
-                file_type = file_extension.lower().lstrip('.') if file_extension else ""
+                # 从文件名提取扩展名并转换为小写（没有扩展名或以点开头/结尾时为空）
+                suggested_name = download.suggested_filename
+                dot = suggested_name.rfind('.')
+                file_type = suggested_name[dot + 1:].lower() if 0 < dot < len(suggested_name) - 1 else ""
                 
                 elapsed = datetime.now() - start_time
                 # return ("成功", f"下载完成，耗时: {elapsed.total_seconds():.2f}秒", file_path, file_type)
                 return ("成功", f"下载完成", file_path, file_type)        
                 
-            except Exception as e:
-                # 捕获所有下载相关的错误（包括超时）
-                print(f"❌ 下载失败: {e}")
+            except PlaywrightTimeoutError:
+                logger.debug("❌ 下载超时")
+                elapsed = datetime.now() - start_time
+                return ("失败", f"链接可点击，但未在限定时间内触发下载。耗时: {elapsed.total_seconds():.2f}秒", "", "")
+            except PlaywrightError as e:
+                logger.debug("❌ 下载失败: %s", e)
                 elapsed = datetime.now() - start_time
-                return ("失败", f"链接可点击，但未在10秒内触发下载。错误: {str(e)[:100]}... 耗时: {elapsed.total_seconds():.2f}秒", "", "")
+                return ("失败", f"下载出错: {format_error(e)}, 耗时: {elapsed.total_seconds():.2f}秒", "", "")
             
-        except Exception as e:
+        except PlaywrightError as e:
             elapsed = datetime.now() - start_time
-            error_msg = f"执行出错: {str(e)}, 耗时: {elapsed.total_seconds():.2f}秒"
+            error_msg = f"执行出错: {format_error(e)}, 耗时: {elapsed.total_seconds():.2f}秒"
             
-            # 保存错误截图
+            # 保存错误截图：只截可视区域并用 JPEG 压缩，长页面整页截图可能耗时数秒、占用数 MB
+            # 页面访问失败在导航阶段已直接返回，不会走到这里
             try:
-                screenshot_name = f"error_{material_name}_{element_name}_{datetime.now().strftime('%H%M%S')}.png"
-                await page.screenshot(path=f"{self.screenshots_dir}/{screenshot_name}", full_page=True)
+                screenshot_name = f"error_{material_name}_{element_name}_{self._run_timestamp}_{next(self._file_counter):05d}.jpg"
+                await page.screenshot(path=f"{self.screenshots_dir}/{screenshot_name}", type="jpeg", quality=60)
                 error_msg += f", 截图: {screenshot_name}"
-            except:
+            except (PlaywrightError, OSError):
                 pass
                 
             return ("失败", error_msg, "", "")
     
+    async def _create_page_pool(self, browser) -> asyncio.Queue:
+        """
+        预先创建页面池，页面在各行之间复用
+        
+        每个页面使用独立的上下文，清理 Cookie 时不会影响其他并发中的页面。
+        """
+        contexts = await asyncio.gather(*(
+            browser.new_context(accept_downloads=True) for _ in range(self.concurrency)
+        ))
+        await asyncio.gather(*(context.route("**/*", block_heavy_resources) for context in contexts))
+        pages = await asyncio.gather(*(context.new_page() for context in contexts))
+        
+        page_pool = asyncio.Queue()
+        for page in pages:
+            page_pool.put_nowait(page)
+        return page_pool
+    
+    async def _release_page(self, page_pool: asyncio.Queue, page):
+        """重置页面状态后放回页面池"""
+        try:
+            if page.is_closed():
+                page = await page.context.new_page()
+            else:
+                await page.goto("about:blank")
+            await page.context.clear_cookies()
+        except Exception as e:
+            logger.warning("⚠️ 重置页面失败: %s", e)
+        page_pool.put_nowait(page)
+    
+    def _required_fields_mask(self, df: pd.DataFrame) -> pd.Series:
+        """
+        必需列统一转换为字符串一次（原地修改 df），空值转为空字符串
+        
+        Returns:
+            pd.Series: 各行的必需字段是否齐全
+        """
+        df[REQUIRED_COLUMNS] = df[REQUIRED_COLUMNS].astype('string').fillna('')
+        return (df[REQUIRED_COLUMNS] != '').all(axis=1)
+    
+    def _group_positions_by_url(self, df: pd.DataFrame, valid_mask: pd.Series) -> dict:
+        """
+        按URL分组，返回 {url: 行位置数组}
+        
+        缺少必需字段的行不参与分组：分组键为空即被 groupby 丢弃
+        """
+        return df.groupby(df['url'].where(valid_mask), sort=False).indices
+    
+    def _frame_rows(self, df: pd.DataFrame) -> list:
+        """将DataFrame转换为行列表，缺失值转换为 None（写入为空单元格）"""
+        return df.astype(object).where(df.notna(), None).values.tolist()
+    
+    def _save_workbook(self, columns: list, rows: list):
+        """
+        以 xlsxwriter 常量内存模式写出结果文件
+        
+        常量内存模式逐行落盘，内存占用不随行数增长；结果中有大量URL，关闭 strings_to_urls
+        避免对每个字符串做URL匹配。write_row 写入的日期时间单元格没有数字格式，
+        需设置 default_date_format，否则会显示为序列号。
+        先写临时文件再替换，写出中途失败时不会留下损坏的结果文件。
+        """
+        root, ext = os.path.splitext(self.output_file)
+        tmp_path = f"{root}.tmp{ext}"
+        
+        workbook = xlsxwriter.Workbook(tmp_path, {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        })
+        try:
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, columns)
+            for row_num, row in enumerate(rows, start=1):
+                worksheet.write_row(row_num, 0, row)
+        finally:
+            workbook.close()
+        os.replace(tmp_path, self.output_file)
+    
+    def _open_progress_log(self, columns: list):
+        """打开进度日志并写入表头"""
+        self._progress_log = open(self.progress_file, 'w', newline='', encoding='utf-8-sig')
+        self._progress_writer = csv.writer(self._progress_log)
+        self._progress_writer.writerow(columns)
+        self._pending_rows = []
+        self._next_position = 0
+    
+    def _close_progress_log(self):
+        """关闭进度日志，尚在等待前序行的结果也一并按位置顺序写出"""
+        if self._progress_log:
+            while self._pending_rows:
+                _, row = heapq.heappop(self._pending_rows)
+                self._progress_writer.writerow(row)
+            self._progress_log.close()
+            self._progress_log = None
+            self._progress_writer = None
+    
+    def _record_progress(self, position: int, status: str, message: str, file_type: str, execution_time: str):
+        """
+        记录一行测试结果，按输入顺序追加到进度日志
+        
+        结果先进入最小堆，堆顶正好是下一个待写位置时连续写出，进度日志始终是结果文件的前缀。
+        """
+        heapq.heappush(self._pending_rows, (
+            position,
+            self._input_rows[position] + [execution_time, f"{status}: {message}", file_type or ""]
+        ))
+        
+        wrote = False
+        while self._pending_rows and self._pending_rows[0][0] == self._next_position:
+            _, row = heapq.heappop(self._pending_rows)
+            self._progress_writer.writerow(row)
+            self._next_position += 1
+            wrote = True
+        if wrote:
+            self._progress_log.flush()
+        if self._progress_bar is not None:
+            self._progress_bar.update()
+    
+    async def _first_success(self, *waiters) -> bool:
+        """
+        并发等待多个条件，任一条件成功即返回 True 并取消其余等待
+        
+        Returns:
+            bool: 是否有条件成功（全部失败或超时时为 False）
+        """
+        tasks = [asyncio.create_task(waiter) for waiter in waiters]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    await next_done
+                    return True
+                except Exception:
+                    continue
+            return False
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _run_url_group(self, page_pool: asyncio.Queue, url: str, rows: list, total_count: int) -> list:
+        """
+        从页面池取出页面，对同一URL的所有行只导航一次，依次执行各行测试
+        
+        页面池大小即并发上限。点击下载后若页面发生了跳转，在处理下一行前重新导航。
+        
+        Args:
+            page_pool: 页面池
+            url: 目标页面URL
+            rows: [(position, material_name, element_name), ...]，position 为行在输入中的位置
+            total_count: 总行数，用于进度显示
+            
+        Returns:
+            list: [(position, (status, message, file_path, file_type, execution_time)), ...]
+        """
+        page = await page_pool.get()
+        results = []
+        try:
+            nav_error = await self._navigate(page, url)
+            # 记录导航后的实际地址（可能经过重定向），用于判断点击后页面是否跳转
+            loaded_url = page.url
+            
+            for position, material_name, element_name in rows:
+                current_num = position + 1
+                logger.debug("📋 执行测试 [%d/%d] URL: %s, 材料: %s, 元素: %s",
+                             current_num, total_count, url, material_name, element_name)
+                
+                if nav_error is None and page.url != loaded_url:
+                    # 上一行的点击使页面发生了跳转，重新导航
+                    nav_error = await self._navigate(page, url)
+                    loaded_url = page.url
+                
+                if nav_error is not None:
+                    status, message, file_path, file_type = nav_error
+                else:
+                    try:
+                        status, message, file_path, file_type = await self._find_and_download(
+                            page, material_name, element_name
+                        )
+                    except Exception as e:
+                        # 兜底：非 Playwright 异常说明程序本身有问题，记录完整堆栈，但不影响其他行
+                        logger.exception("未预期的错误")
+                        status, message, file_path, file_type = "失败", f"未预期的错误 - {format_error(e)}", "", ""
+                
+                execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                
+                if status == "成功":
+                    logger.info("✅ [%d/%d] %s 文件: %s 格式: %s", current_num, total_count, message, file_path, file_type)
+                else:
+                    logger.info("❌ [%d/%d] %s", current_num, total_count, message)
+                
+                results.append((position, (status, message, file_path, file_type, execution_time)))
+                self._record_progress(position, status, message, file_type, execution_time)
+            
+            return results
+        finally:
+            await self._release_page(page_pool, page)
+    
     async def _perform_document_validation(self, df: pd.DataFrame, download_files: dict):
         """
         执行文档校验
         
+        各材料的校验相互独立，并发执行；同时进行的API请求数量由文档校验器限制
+        
         Args:
             df: 数据框，用于更新校验结果
             download_files: 下载文件信息字典
         """
-        for material_name, files in download_files.items():
-            print(f"\n🔍 校验材料: {material_name}")
-            
-            blank_form_path = files.get('空白表格')
-            sample_form_path = files.get('示例样表')
-            
-            if blank_form_path or sample_form_path:
-                try:
-                    # 执行文档校验
-                    validation_result = await self.document_validator.validate_documents(
-                        material_name, blank_form_path, sample_form_path
-                    )
-                    
-                    # 更新DataFrame中对应的行
-                    self._update_validation_results(df, material_name, validation_result)
-                    
-                    print(f"✅ 材料'{material_name}'校验完成")
-                    
-                except Exception as e:
-                    print(f"❌ 材料'{material_name}'校验失败: {e}")
-                    # 将错误信息写入结果
-                    self._update_validation_error(df, material_name, str(e))
+        # Word文档整批交给 LibreOffice 转换一次，避免每个文档各启动一次
+        await self.document_validator.preconvert_word_documents(
+            [path for files in download_files.values() for path in files.values()]
+        )
+        
+        await asyncio.gather(*(
+            self._validate_material(df, material_name, files)
+            for material_name, files in download_files.items()
+        ))
+    
+    async def _validate_material(self, df: pd.DataFrame, material_name: str, files: dict):
+        """
+        校验单个材料的文档并写回结果
+        
+        Args:
+            df: 数据框，用于更新校验结果
+            material_name: 材料名称
+            files: {'空白表格': file_path, '示例样表': file_path}
+        """
+        print(f"\n🔍 校验材料: {material_name}")
+        
+        blank_form_path = files.get('空白表格')
+        sample_form_path = files.get('示例样表')
+        
+        if blank_form_path or sample_form_path:
+            try:
+                # 执行文档校验
+                validation_result = await self.document_validator.validate_documents(
+                    material_name, blank_form_path, sample_form_path
+                )
+                
+                # 更新DataFrame中对应的行
+                self._update_validation_results(df, material_name, validation_result)
+                
+                print(f"✅ 材料'{material_name}'校验完成")
+                
+            except Exception as e:
+                print(f"❌ 材料'{material_name}'校验失败: {e}")
+                # 将错误信息写入结果
+                self._update_validation_error(df, material_name, str(e))
     
     def _update_validation_results(self, df: pd.DataFrame, material_name: str, result: ValidationResult):
         """
@@ -310,21 +589,18 @@ class BatchTestRunner:
             material_name: 材料名称
             result: 校验结果
         """
-        # 找到对应材料名称的所有行
-        material_rows = df[df['材料名称'] == material_name]
-        
-        for index in material_rows.index:
-            element_name = df.at[index, '元素名称']
-            
-            # 根据元素类型更新相应的校验结果
-            if element_name in ['空白表格', '示例样表']:
-                # 更新所有校验列
-                df.at[index, '两表格内容样式是否一致'] = self._format_validation_result(result.forms_consistent, result.forms_consistent_reason)
-                df.at[index, '材料名称和空白表格主旨是否相符'] = self._format_validation_result(result.blank_form_matches, result.blank_form_matches_reason)
-                df.at[index, '材料名称和示例样表主旨是否相符'] = self._format_validation_result(result.sample_form_matches, result.sample_form_matches_reason)
-                df.at[index, '空白表格无示例'] = self._format_validation_result(result.blank_form_empty, result.blank_form_empty_reason)
-                df.at[index, '示例样表包含填写示例'] = self._format_validation_result(result.sample_form_filled, result.sample_form_filled_reason)
-                df.at[index, '示例样表信息是否打码'] = self._format_validation_result(result.sample_info_masked, result.sample_info_masked_reason)
+        # 一次布尔筛选出该材料的表格行，整块赋值，不再逐行取值判断
+        validation_values = [
+            self._format_validation_result(result.forms_consistent, result.forms_consistent_reason),
+            self._format_validation_result(result.blank_form_matches, result.blank_form_matches_reason),
+            self._format_validation_result(result.sample_form_matches, result.sample_form_matches_reason),
+            self._format_validation_result(result.blank_form_empty, result.blank_form_empty_reason),
+            self._format_validation_result(result.sample_form_filled, result.sample_form_filled_reason),
+            self._format_validation_result(result.sample_info_masked, result.sample_info_masked_reason),
+        ]
+        form_rows = self._form_rows_mask(df, material_name)
+        for column, value in zip(VALIDATION_COLUMNS, validation_values):
+            df.loc[form_rows, column] = value
     
     def _update_validation_error(self, df: pd.DataFrame, material_name: str, error_msg: str):
         """
@@ -335,17 +611,11 @@ class BatchTestRunner:
             material_name: 材料名称
             error_msg: 错误信息
         """
-        material_rows = df[df['材料名称'] == material_name]
-        
-        for index in material_rows.index:
-            element_name = df.at[index, '元素名称']
-            if element_name in ['空白表格', '示例样表']:
-                df.at[index, '两表格内容样式是否一致'] = f"校验出错: {error_msg}"
-                df.at[index, '材料名称和空白表格主旨是否相符'] = f"校验出错: {error_msg}"
-                df.at[index, '材料名称和示例样表主旨是否相符'] = f"校验出错: {error_msg}"
-                df.at[index, '空白表格无示例'] = f"校验出错: {error_msg}"
-                df.at[index, '示例样表包含填写示例'] = f"校验出错: {error_msg}"
-                df.at[index, '示例样表信息是否打码'] = f"校验出错: {error_msg}"
+        df.loc[self._form_rows_mask(df, material_name), VALIDATION_COLUMNS] = f"校验出错: {error_msg}"
+    
+    def _form_rows_mask(self, df: pd.DataFrame, material_name: str) -> pd.Series:
+        """该材料的空白表格/示例样表行的布尔掩码"""
+        return (df['材料名称'] == material_name) & df['元素名称'].isin(['空白表格', '示例样表'])
     
     def _format_validation_result(self, result: bool, reason: str) -> str:
         """
@@ -372,38 +642,41 @@ class BatchTestRunner:
         print(f"📖 正在读取输入文件: {self.input_file}")
         
         try:
-            df = pd.read_excel(self.input_file)
+            # 只读取第一个工作表；必需列按字符串读取，跳过逐单元格类型推断（如纯数字的材料名称）
+            # 其余列原样保留，会随结果一并写回输出文件
+            df = pd.read_excel(
+                self.input_file,
+                engine='openpyxl',
+                dtype={col: str for col in REQUIRED_COLUMNS}
+            )
             print(f"✅ 成功读取 {len(df)} 行数据")
         except Exception as e:
             print(f"❌ 读取文件失败: {e}")
             return
             
         # 检查必需的列
-        required_columns = ['url', '材料名称', '元素名称']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = set(REQUIRED_COLUMNS) - set(df.columns)
         if missing_columns:
-            print(f"❌ 缺少必需的列: {missing_columns}")
+            print(f"❌ 缺少必需的列: {sorted(missing_columns)}")
             return
-            
-        # 添加结果列
-        df['执行时间'] = ""
-        df['执行结果'] = ""
-        df['文件格式'] = ""
         
-        # 添加文档校验列
-        df['两表格内容样式是否一致'] = ""
-        df['材料名称和空白表格主旨是否相符'] = ""
-        df['材料名称和示例样表主旨是否相符'] = ""
-        df['空白表格无示例'] = ""
-        df['示例样表包含填写示例'] = ""
-        df['示例样表信息是否打码'] = ""
+        # 输入中已有的结果列和校验列（如上次运行的输出）是过期数据，先去掉；
+        # 之后输出列顺序固定为“输入列 + 结果列 + 校验列”，进度日志的列正好是其前缀
+        stale_columns = [col for col in RESULT_COLUMNS + VALIDATION_COLUMNS if col in df.columns]
+        if stale_columns:
+            df = df.drop(columns=stale_columns)
         
+        # 任一必需字段为空的行不执行测试，直接记为失败
+        valid_mask = self._required_fields_mask(df)
+        invalid_count = int((~valid_mask).sum())
+        if invalid_count:
+            print(f"⚠️ {invalid_count} 行缺少必需字段，将直接记为失败")
+            
         # --- 2. 初始化浏览器 ---
         print("\n🌐 正在初始化浏览器...")
         
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)
-            context = await browser.new_context(accept_downloads=True)
+            browser = await p.chromium.launch(headless=HEADLESS, args=LAUNCH_ARGS)
             
             # --- 3. 批量执行测试 ---
             total_count = len(df)
@@ -412,58 +685,76 @@ class BatchTestRunner:
             # 用于存储下载文件信息，以便进行配对校验
             download_files = {}  # {material_name: {'空白表格': file_path, '示例样表': file_path}}
             
-            for index, row in df.iterrows():
-                current_num = index + 1
-                url = row['url']
-                material_name = row['材料名称'] 
-                element_name = row['元素名称']
-                
-                print(f"\n{'='*60}")
-                print(f"📋 执行测试 [{current_num}/{total_count}]")
-                print(f"   URL: {url}")
-                print(f"   材料: {material_name}")
-                print(f"   元素: {element_name}")
-
-                # 创建新页面
-                page = await context.new_page()
-                
-                try:
-                    # 执行单个测试
-                    status, message, file_path, file_type = await self.test_single_download_link(
-                        page, url, material_name, element_name
-                    )
+            # 按URL分组，同一URL的各行共用一次页面导航；各组相互独立且以网络等待为主，并发执行，
+            # 页面池限制同时进行的组数量
+            page_pool = await self._create_page_pool(browser)
+            # 此时 df 只含输入列，进度日志的表头和每行数据与结果文件的前几列一一对应
+            self._input_rows = self._frame_rows(df)
+            self._open_progress_log(list(df.columns) + RESULT_COLUMNS)
+            print(f"📝 进度日志: {self.progress_file}")
+            material_names = df['材料名称'].tolist()
+            element_names = df['元素名称'].tolist()
+            
+            try:
+                with logging_redirect_tqdm(), tqdm(total=total_count, unit="行", desc="批量测试") as progress_bar:
+                    self._progress_bar = progress_bar
                     
-                    # 记录基本结果
-                    execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    df.at[index, '执行时间'] = execution_time
-                    df.at[index, '执行结果'] = f"{status}: {message}"
-                    df.at[index, '文件格式'] = file_type if file_type else ""
+                    invalid_results = []
+                    urls = df['url'].tolist()
+                    for pos, is_valid in enumerate(valid_mask.tolist()):
+                        if is_valid:
+                            continue
+                        row_values = (urls[pos], material_names[pos], element_names[pos])
+                        missing_fields = [col for col, value in zip(REQUIRED_COLUMNS, row_values) if not value]
+                        result = ("失败", f"缺少必需字段: {', '.join(missing_fields)}", "", "",
+                                  datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                        invalid_results.append((pos, result))
+                        self._record_progress(pos, result[0], result[1], result[3], result[4])
+                    
+                    url_groups = self._group_positions_by_url(df, valid_mask)
+                    async with asyncio.TaskGroup() as tg:
+                        tasks = [
+                            tg.create_task(self._run_url_group(
+                                page_pool, url,
+                                [(pos, material_names[pos], element_names[pos]) for pos in positions],
+                                total_count
+                            ))
+                            for url, positions in url_groups.items()
+                        ]
+            finally:
+                self._progress_bar = None
+                self._close_progress_log()
+            
+            # 所有任务完成后按位置收集结果，再整列写回DataFrame，避免并发修改和逐单元格赋值
+            execution_times = [""] * total_count
+            outcomes = [""] * total_count
+            file_types = [""] * total_count
+            statuses = [""] * total_count
+            
+            for group_results in [invalid_results] + [task.result() for task in tasks]:
+                for i, (status, message, file_path, file_type, execution_time) in group_results:
+                    execution_times[i] = execution_time
+                    statuses[i] = status
+                    outcomes[i] = f"{status}: {message}"
+                    file_types[i] = file_type if file_type else ""
                     
                     if status == "成功":
                         success_count += 1
-                        print(f"✅ {message}")
                         if file_path:
-                            print(f"   文件: {file_path}")
-                            
                             # 保存下载文件信息以便后续校验
+                            material_name = material_names[i]
                             if material_name not in download_files:
                                 download_files[material_name] = {}
-                            download_files[material_name][element_name] = file_path
-                            
-                        if file_type:
-                            print(f"   格式: {file_type}")
-                    else:
-                        print(f"❌ {message}")
-                        
-                except Exception as e:
-                    execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    df.at[index, '执行时间'] = execution_time
-                    df.at[index, '执行结果'] = f"失败: 未预期的错误 - {e}"
-                    df.at[index, '文件格式'] = ""
-                    print(f"❌ 未预期的错误: {e}")
-                
-                finally:
-                    await page.close()
+                            download_files[material_name][element_names[i]] = file_path
+            
+            # 添加结果列
+            df['执行时间'] = execution_times
+            df['执行结果'] = outcomes
+            df['文件格式'] = file_types
+            
+            # 添加文档校验列
+            for column in VALIDATION_COLUMNS:
+                df[column] = ""
                     
             # --- 4. 执行文档校验 ---
             if self.document_validator and download_files:
@@ -491,21 +782,26 @@ class BatchTestRunner:
         # --- 5. 输出结果文件 ---
         print(f"\n💾 正在保存结果到: {self.output_file}")
         try:
-            df.to_excel(self.output_file, index=False)
+            self._save_workbook(list(df.columns), self._frame_rows(df))
             print(f"✅ 结果文件保存成功!")
+            # 结果已完整写入 Excel，进度日志不再需要
+            os.remove(self.progress_file)
             
             # 显示结果摘要
             print(f"\n📋 结果摘要:")
-            success_rows = df[df['执行结果'].str.contains('成功', na=False)]
-            failure_rows = df[df['执行结果'].str.contains('失败', na=False)]
+            # 直接比较状态值，无需对结果文本做子串扫描
+            success_mask = pd.Series(statuses, index=df.index) == "成功"
+            failure_mask = ~success_mask
+            failure_count = int(failure_mask.sum())
             
-            print(f"   ✅ 成功: {len(success_rows)} 条")
-            print(f"   ❌ 失败: {len(failure_rows)} 条")
+            print(f"   ✅ 成功: {int(success_mask.sum())} 条")
+            print(f"   ❌ 失败: {failure_count} 条")
             
-            if len(failure_rows) > 0:
+            if failure_count > 0:
                 print(f"\n🔍 失败详情:")
-                for _, row in failure_rows.iterrows():
-                    print(f"   - {row['材料名称']} / {row['元素名称']}: {row['执行结果']}")
+                failure_rows = df.loc[failure_mask, ['材料名称', '元素名称', '执行结果']]
+                for material_name, element_name, outcome in failure_rows.itertuples(index=False):
+                    print(f"   - {material_name} / {element_name}: {outcome}")
                     
         except Exception as e:
             print(f"❌ 保存结果文件失败: {e}")
@@ -515,6 +811,8 @@ async def main():
     parser = argparse.ArgumentParser(description='批量测试下载链接功能')
     parser.add_argument('input_file', nargs='?', default='sample_test_data.xlsx', help='输入的Excel文件路径（默认: sample_test_data.xlsx）')
     parser.add_argument('-o', '--output', help='输出的Excel文件路径（可选）')
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='同时执行的测试数量（默认: 4）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出每一行测试的详细步骤')
     parser.add_argument(
         '--openai-key',
         help='OpenAI API密钥（启用文档校验功能）',
@@ -531,6 +829,10 @@ async def main():
     
     args = parser.parse_args()
     
+    logging.basicConfig(format="%(message)s", level=logging.WARNING)
+    # 只放开本脚本的详细日志，第三方库保持警告级别
+    logger.setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+    
     # 检查输入文件是否存在
     if not os.path.exists(args.input_file):
         print(f"❌ 输入文件不存在: {args.input_file}")
@@ -549,7 +851,8 @@ async def main():
         input_file=args.input_file, 
         output_file=args.output,
         openai_api_key=openai_api_key,
-        openai_base_url=openai_base_url
+        openai_base_url=openai_base_url,
+        concurrency=args.concurrency
     )
     await runner.run_batch_tests()
 
@@ -9,145 +9,67 @@ def create_sample_data():
     """创建示例测试数据"""
     
     # 根据您图片中的数据创建示例数据
-    test_data = [
-        {
-            "序号": 1,
-            "事项类型": "事项巡检",
-            "事项名称": "招聘会员位预约",
-            "检测类型": "事项巡检",
-            "url": "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002",
-            "材料名称": "招聘会员位申请",
-            "元素名称": "空白表格",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 2,
-            "事项类型": "事项巡检",
-            "事项名称": "招聘会员位预约",
-            "检测类型": "事项巡检", 
-            "url": "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002",
-            "材料名称": "招聘会员位申请",
-            "元素名称": "示例样表",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 3,
-            "事项类型": "事项巡检",
-            "事项名称": "我省居民赴港澳探亲签注的许可",
-            "检测类型": "事项巡检",
-            "url": "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002", 
-            "材料名称": "证明相应亲属关系文件",
-            "元素名称": "示例样表",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 4,
-            "事项类型": "事项巡检", 
-            "事项名称": "我省居民赴港澳探亲签注的许可",
-            "检测类型": "事项巡检",
-            "url": "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002",
-            "材料名称": "往来港澳通行证",
-            "元素名称": "示例样表", 
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 5,
-            "事项类型": "事项巡检",
-            "事项名称": "我省居民赴港澳探亲签注的许可",
-            "检测类型": "事项巡检",
-            "url": "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002",
-            "材料名称": "中国公民出入境证件申请表",
-            "元素名称": "空白表格",
-            "元素类型": "下载链接", 
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 6,
-            "事项类型": "事项巡检",
-            "事项名称": "我省居民赴港澳探亲签注的许可", 
-            "检测类型": "事项巡检",
-            "url": "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002",
-            "材料名称": "中国公民出入境证件申请表",
-            "元素名称": "示例样表",
-            "元素类型": "下载链接",
-            "执行方式": "playwright", 
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 7,
-            "事项类型": "事项巡检",
-            "事项名称": "江苏省新型冠状病毒肺炎疫情防控", 
-            "检测类型": "事项巡检",
-            "url": "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002",
-            "材料名称": "江苏省新型冠状病毒检测体检表",
-            "元素名称": "空白表格",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 8,
-            "事项类型": "事项巡检",
-            "事项名称": "江苏省新型冠状病毒肺炎疫情防控",
-            "检测类型": "事项巡检", 
-            "url": "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002",
-            "材料名称": "江苏省新型冠状病毒检测体检表",
-            "元素名称": "示例样表",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 9,
-            "事项类型": "事项巡检",
-            "事项名称": "江苏省新型冠状病毒肺炎疫情防控",
-            "检测类型": "事项巡检",
-            "url": "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002", 
-            "材料名称": "申请主体资格证书",
-            "元素名称": "空白表格",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        },
-        {
-            "序号": 10,
-            "事项类型": "事项巡检",
-            "事项名称": "江苏省新型冠状病毒肺炎疫情防控", 
-            "检测类型": "事项巡检",
-            "url": "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002",
-            "材料名称": "申请主体资格证书", 
-            "元素名称": "示例样表",
-            "元素类型": "下载链接",
-            "执行方式": "playwright",
-            "执行时间": "",
-            "执行结果": ""
-        }
+    # 按列组织：只有事项名称、url、材料名称、元素名称逐行变化，其余列为常量
+    zwfw_url = "https://www.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=1132050001414925263320105028002"
+    sz_zwfw_url = "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002"
+    
+    item_names = [
+        "招聘会员位预约",
+        "招聘会员位预约",
+        "我省居民赴港澳探亲签注的许可",
+        "我省居民赴港澳探亲签注的许可",
+        "我省居民赴港澳探亲签注的许可",
+        "我省居民赴港澳探亲签注的许可",
+        "江苏省新型冠状病毒肺炎疫情防控",
+        "江苏省新型冠状病毒肺炎疫情防控",
+        "江苏省新型冠状病毒肺炎疫情防控",
+        "江苏省新型冠状病毒肺炎疫情防控",
+    ]
+    urls = [zwfw_url] * 6 + [sz_zwfw_url] * 4
+    material_names = [
+        "招聘会员位申请",
+        "招聘会员位申请",
+        "证明相应亲属关系文件",
+        "往来港澳通行证",
+        "中国公民出入境证件申请表",
+        "中国公民出入境证件申请表",
+        "江苏省新型冠状病毒检测体检表",
+        "江苏省新型冠状病毒检测体检表",
+        "申请主体资格证书",
+        "申请主体资格证书",
+    ]
+    element_names = [
+        "空白表格",
+        "示例样表",
+        "示例样表",
+        "示例样表",
+        "空白表格",
+        "示例样表",
+        "空白表格",
+        "示例样表",
+        "空白表格",
+        "示例样表",
     ]
+    n = len(urls)
     
     # 创建DataFrame
-    df = pd.DataFrame(test_data)
+    df = pd.DataFrame({
+        "序号": list(range(1, n + 1)),
+        "事项类型": ["事项巡检"] * n,
+        "事项名称": item_names,
+        "检测类型": ["事项巡检"] * n,
+        "url": urls,
+        "材料名称": material_names,
+        "元素名称": element_names,
+        "元素类型": ["下载链接"] * n,
+        "执行方式": ["playwright"] * n,
+        "执行时间": [""] * n,
+        "执行结果": [""] * n,
+    })
     
     # 保存为Excel文件
     output_file = "sample_test_data.xlsx"
-    df.to_excel(output_file, index=False)
+    df.to_excel(output_file, index=False, engine="xlsxwriter")
     
     print(f"✅ 示例测试数据已创建: {output_file}")
     print(f"📊 数据包含 {len(df)} 行测试用例")
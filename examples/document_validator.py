@@ -13,21 +13,139 @@
 """
 
 import os
+import re
+import asyncio
 import base64
+from collections import OrderedDict
 from io import BytesIO
 from typing import Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from pathlib import Path
 
-import fitz  # PyMuPDF
-from PIL import Image
+import httpx
 from openai import AsyncOpenAI
-from PIL import ImageDraw, ImageFont
-# 这个是 python-docx 包引入的
-from docx import Document
 
+from validation_cache import check_cache, make_cache_key, save_to_cache
 
-@dataclass
+try:
+    from orjson import loads as json_loads
+except ImportError:  # 未安装 orjson 时退回标准库
+    from json import loads as json_loads
+
+
+# 同时进行的视觉模型请求数上限，多个材料并发校验时避免触发服务端限流
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("VALIDATOR_MAX_CONCURRENT", "8"))
+
+# 使用的视觉模型
+VISION_MODEL = "qwen-vl-max-latest"
+
+# 页面渲染参数：视觉模型会把图片缩放到约 1024px 的分块，108 DPI（1.5 倍）的 JPEG 已足够识别，
+# 比 2 倍 PNG 的 base64 数据小数倍，上传更快、消耗的 token 更少
+RENDER_DPI = 108
+JPEG_QUALITY = 85
+
+# 从模型响应中提取JSON对象：第一个 "{" 到最后一个 "}"，兼容 ```json 代码块和前后说明文字
+JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+
+# 进程内保留的base64图片数量上限，同一文件以不同材料名称再次校验时无需重新转换和编码
+IMAGE_CACHE_SIZE = 32
+
+# 需要先经 LibreOffice 转换为PDF的文档格式
+WORD_EXTENSIONS = ['.doc', '.docx']
+
+# 提示词版本，修改提示词或模型时更新，使旧的缓存结果自动失效
+PROMPT_VERSION = "v1"
+
+# 同时校验空白表格和示例样表的提示词，材料名称处预先切分，每次调用只需拼接
+BOTH_PROMPT_PARTS = tuple("""
+你是一位专业的政务材料审查员。请仔细分析下面两张文档图片，进行全面校验。
+
+# 输入信息
+- 材料名称: "{material_name}"
+- 图片A: 空白表格
+- 图片B: 示例样表
+
+# 校验任务
+请对以下6个方面进行校验，并给出明确的true/false判断：
+
+1. `consistency`: 空白表格和示例样表在整体布局、结构、表格项目和样式上是否基本一致？它们看起来应该是同一个模板的两种状态（一个未填写，一个已填写）。
+2. `blank_form_matches`: 请宽松判断：空白表格的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
+3. `sample_form_matches`: 请宽松判断：示例样表的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
+4. `blank_form_has_no_samples`: 空白表格中是否不包含任何个人信息填写示例？表格应该是干净的、待填写的状态。
+5. `sample_form_has_samples`: 示例样表中是否清晰地包含了填写示例？
+6. `sample_info_masked`: 示例样表中的个人信息（姓名、电话、地址等）是否已经打码处理？（如"张xx"、"139xxxx"等）
+
+# 输出格式 (严格JSON格式)
+{
+  "forms_consistent": true,
+  "forms_consistent_reason": "详细说明判断理由",
+  "blank_form_matches": true,
+  "blank_form_matches_reason": "详细说明判断理由",
+  "sample_form_matches": true,
+  "sample_form_matches_reason": "详细说明判断理由",
+  "blank_form_empty": true,
+  "blank_form_empty_reason": "详细说明判断理由",
+  "sample_form_filled": true,
+  "sample_form_filled_reason": "详细说明判断理由",
+  "sample_info_masked": true,
+  "sample_info_masked_reason": "详细说明判断理由"
+}""".split("{material_name}"))
+
+# 只校验空白表格的提示词，材料名称处预先切分，每次调用只需拼接
+BLANK_PROMPT_PARTS = tuple("""
+        你是一位专业的政务材料审查员。请仔细分析下面的文档图片，进行全面校验。
+        
+        # 输入信息
+        - 材料名称: "{material_name}"
+        - 文档类型: 空白表格
+        
+        # 校验图片
+        <image>
+        
+        # 校验要求
+        请对以下3个方面进行校验，并给出明确的true/false判断：
+        
+        1. `blank_form_matches`: 请宽松判断：空白表格的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
+        2. `blank_form_has_no_samples`: 空白表格中是否不包含任何个人信息填写示例？表格应该是干净的、待填写的状态。
+        
+        # 输出格式
+{
+  "blank_form_matches": true,
+  "blank_form_matches_reason": "详细说明判断理由",
+  "blank_form_empty": true,
+  "blank_form_empty_reason": "详细说明判断理由"
+}""".split("{material_name}"))
+
+# 只校验示例样表的提示词，材料名称处预先切分，每次调用只需拼接
+SAMPLE_PROMPT_PARTS = tuple("""
+        你是一位专业的政务材料审查员。请仔细分析下面的文档图片，进行全面校验。
+        
+        # 输入信息
+        - 材料名称: "{material_name}"
+        - 文档类型: 示例样表
+        
+        # 校验图片
+        <image>
+        
+        # 校验要求
+        请对以下3个方面进行校验，并给出明确的true/false判断：
+        
+        1. `sample_form_matches`: 请宽松判断：示例样表的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
+        2. `sample_form_has_samples`: 示例样表中是否清晰地包含了填写示例？
+        3. `sample_info_masked`: 示例样表中的个人信息（姓名、电话、地址等）是否已经打码处理？（如"张xx"、"139xxxx"等）
+        
+        # 输出格式
+{
+  "sample_form_matches": true,
+  "sample_form_matches_reason": "详细说明判断理由",
+  "sample_form_filled": true,
+  "sample_form_filled_reason": "详细说明判断理由",
+  "sample_info_masked": true,
+  "sample_info_masked_reason": "详细说明判断理由"
+}""".split("{material_name}"))
+
+
+@dataclass(slots=True)
 class ValidationResult:
     """校验结果数据类"""
     forms_consistent: Optional[bool] = None  # 两表格内容、样式格式是否一致
@@ -46,9 +164,152 @@ class ValidationResult:
     sample_info_masked_reason: str = ""
 
 
+# 共享的 OpenAI 客户端 {(api_key, base_url): [client, 引用计数]}
+# 同一端点的校验器共用一个连接池，已建立的 TLS 连接可在各实例、各请求间复用
+_shared_clients = {}
+
+
+def _get_or_create_client(api_key: str, base_url: str = None) -> AsyncOpenAI:
+    """
+    获取共享的 AsyncOpenAI 客户端，不存在时创建，并增加引用计数
+    
+    Args:
+        api_key: OpenAI API密钥
+        base_url: OpenAI API基础URL（可选）
+        
+    Returns:
+        AsyncOpenAI: 客户端
+    """
+    key = (api_key, base_url)
+    entry = _shared_clients.get(key)
+    if entry is None:
+        # 构建客户端初始化参数
+        client_kwargs = {
+            "api_key": api_key,
+        }
+        
+        # 只有在提供了base_url时才添加
+        if base_url:
+            client_kwargs["base_url"] = base_url
+        
+        # 为了兼容OpenRouter等第三方服务，添加超时配置
+        client_kwargs["timeout"] = 60.0
+        
+        # 保持足够的长连接，并发请求时不必反复握手
+        client_kwargs["http_client"] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=60.0
+        )
+        
+        entry = _shared_clients[key] = [AsyncOpenAI(**client_kwargs), 0]
+    entry[1] += 1
+    return entry[0]
+
+
+async def _release_client(api_key: str, base_url: str = None):
+    """减少共享客户端的引用计数，最后一个使用者释放时关闭客户端"""
+    key = (api_key, base_url)
+    entry = _shared_clients.get(key)
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del _shared_clients[key]
+        await entry[0].close()
+
+
+# 所有校验器共用的视觉模型请求信号量，批量运行时每个材料各有一个校验器，
+# 放在实例上会使总并发数变为 材料数 × MAX_CONCURRENT_REQUESTS
+_request_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_request_semaphore() -> asyncio.Semaphore:
+    """获取共享的请求信号量，首次使用时在当前事件循环中创建"""
+    global _request_semaphore
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _request_semaphore
+
+
+# 所有校验器共用的 soffice 转换锁：同一用户配置下 LibreOffice 不能同时运行多个实例，
+# 每个校验器各持一把锁时，不同材料的转换仍会并发执行
+_soffice_lock: Optional[asyncio.Lock] = None
+
+
+def _get_soffice_lock() -> asyncio.Lock:
+    """获取共享的 soffice 转换锁，首次使用时在当前事件循环中创建"""
+    global _soffice_lock
+    if _soffice_lock is None:
+        _soffice_lock = asyncio.Lock()
+    return _soffice_lock
+
+
+async def convert_docs_to_pdfs_batch(file_paths: list, output_dir: str) -> Dict[str, str]:
+    """
+    用一次 soffice 调用把多个Word文档转换为PDF，LibreOffice 的启动开销（每次 1-3 秒）只付一次
+    
+    输出文件以输入文件名命名，调用方需保证同一批中的文件名（不含扩展名）互不相同。
+    
+    Args:
+        file_paths: Word文档路径列表
+        output_dir: PDF输出目录
+        
+    Returns:
+        Dict[str, str]: {文档路径: 生成的PDF路径}，只包含转换成功的文档；LibreOffice 不可用时为空
+    """
+    if not file_paths:
+        return {}
+    
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_paths = {path: os.path.join(output_dir, f"{Path(path).stem}.pdf") for path in file_paths}
+    # 先删除之前运行留下的同名PDF，否则本次转换失败时旧文件会被当作转换结果
+    for pdf_path in pdf_paths.values():
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+    
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            'soffice', '--headless', '--convert-to', 'pdf',
+            '--outdir', output_dir, *file_paths,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await proc.communicate()
+    except FileNotFoundError:
+        return {}
+    
+    stderr_text = stderr.decode(errors="replace").strip()
+    if proc.returncode != 0:
+        print(f"❌ LibreOffice 转换失败 (退出码 {proc.returncode}): {stderr_text}")
+        # 异常退出时生成的文件不可信，全部删除，调用方按未转换处理
+        for pdf_path in pdf_paths.values():
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+        return {}
+    
+    # 个别文件转换失败时 soffice 仍会处理其余文件并正常退出，按生成的文件判断结果
+    converted = {path: pdf_path for path, pdf_path in pdf_paths.items() if os.path.exists(pdf_path)}
+    if len(converted) < len(file_paths):
+        print(f"⚠️ LibreOffice 未能转换 {len(file_paths) - len(converted)} 个文档: {stderr_text}")
+    return converted
+
+
 class DocumentValidator:
     """文档校验器"""
     
+    # 模型响应中的判断项及其理由字段，与 ValidationResult 的属性同名
+    _RESULT_FIELDS = tuple(
+        (name, f"{name}_reason")
+        for name in (
+            "forms_consistent",
+            "blank_form_matches",
+            "sample_form_matches",
+            "blank_form_empty",
+            "sample_form_filled",
+            "sample_info_masked",
+        )
+    )
+    
     def __init__(self, openai_api_key: str, openai_base_url: str = None):
         """
         初始化文档校验器
@@ -57,21 +318,16 @@ class DocumentValidator:
             openai_api_key: OpenAI API密钥
             openai_base_url: OpenAI API基础URL（可选，用于使用代理或第三方服务）
         """
+        # 批量预转换得到的PDF {文档路径: PDF路径}，渲染后删除
+        self._converted_pdfs = {}
+        # 已编码图片 {(文档路径, 修改时间, 文件大小): base64}，按最近使用顺序淘汰
+        self._b64_cache = OrderedDict()
+        
+        self._client_key = (openai_api_key, openai_base_url)
+        
         try:
-            # 构建客户端初始化参数
-            client_kwargs = {
-                "api_key": openai_api_key,
-            }
-            
-            # 只有在提供了base_url时才添加
-            if openai_base_url:
-                client_kwargs["base_url"] = openai_base_url
-            
-            # 为了兼容OpenRouter等第三方服务，添加超时配置
-            client_kwargs["timeout"] = 60.0
-            
-            # 初始化AsyncOpenAI客户端
-            self.client = AsyncOpenAI(**client_kwargs)
+            # 获取共享的AsyncOpenAI客户端
+            self.client = _get_or_create_client(openai_api_key, openai_base_url)
             
             # 测试连接可用性
             print(f"✅ OpenAI客户端初始化成功，API端点: {openai_base_url or 'https://api.openai.com'}")
@@ -85,101 +341,187 @@ class DocumentValidator:
     
     async def close(self):
         """
-        关闭OpenAI客户端，释放资源
+        释放OpenAI客户端；客户端为共享的，最后一个使用它的校验器关闭时才真正关闭
         """
         try:
             if hasattr(self, 'client') and self.client:
-                await self.client.close()
+                self.client = None
+                await _release_client(*self._client_key)
         except Exception as e:
             print(f"⚠️ 关闭OpenAI客户端时出错: {e}")
         
-    def convert_document_to_image(self, file_path: str, output_dir: str = "temp_images") -> str:
+    async def _create_completion(self, messages: list, max_tokens: int) -> str:
         """
-        将文档转换为高清图片
+        调用视觉模型，返回响应文本；所有校验器合计的并发请求数受 MAX_CONCURRENT_REQUESTS 限制
+        
+        调用方可以并发校验多个材料：
+            await asyncio.gather(*(validator.validate_documents(name, blank, sample) for ...))
+        """
+        async with _get_request_semaphore():
+            response = await self.client.chat.completions.create(
+                model=VISION_MODEL,  # 使用支持视觉的模型
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.1
+            )
+        return response.choices[0].message.content
+    
+    def _render_first_page(self, pdf_path: str) -> bytes:
+        """
+        将PDF第一页渲染为JPEG字节
+        
+        Args:
+            pdf_path: PDF文件路径
+            
+        Returns:
+            bytes: JPEG图片数据
+        """
+        import fitz  # PyMuPDF，只在需要渲染时导入
+        
+        pdf_doc = fitz.open(pdf_path)
+        try:
+            page = pdf_doc[0]  # 取第一页
+            
+            # 由 PyMuPDF 直接编码为 JPEG，无需 PIL；不带透明通道，像素缓冲更小
+            pix = page.get_pixmap(dpi=RENDER_DPI, alpha=False)
+            return pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+        finally:
+            pdf_doc.close()
+    
+    async def convert_document_to_image_bytes(self, file_path: str, work_dir: str = "temp_images") -> bytes:
+        """
+        将文档第一页转换为JPEG图片数据，全程在内存中完成
+        
+        PyMuPDF 渲染在线程中执行，LibreOffice 以异步子进程运行，转换期间不阻塞事件循环，
+        其他材料的校验请求可以同时进行。
         
         Args:
             file_path: 文档文件路径
-            output_dir: 图片输出目录
+            work_dir: Word文档转换PDF时使用的临时目录
             
         Returns:
-            str: 生成的图片路径
+            bytes: JPEG图片数据
             
         Raises:
             ValueError: 不支持的文件格式
             Exception: 文档转换失败
         """
-        # 创建输出目录
-        os.makedirs(output_dir, exist_ok=True)
-        
         file_ext = Path(file_path).suffix.lower()
-        file_stem = Path(file_path).stem
-        output_path = os.path.join(output_dir, f"{file_stem}.png")
         
         try:
             if file_ext in ['.pdf']:
-                # 处理PDF文件
-                pdf_doc = fitz.open(file_path)
-                page = pdf_doc[0]  # 取第一页
-                
-                # 设置高分辨率渲染
-                mat = fitz.Matrix(2.0, 2.0)  # 放大2倍提高清晰度
-                pix = page.get_pixmap(matrix=mat)
-                
-                # 转换为PIL Image
-                img_data = pix.tobytes("png")
-                img = Image.open(BytesIO(img_data))
-                
-                pdf_doc.close()
+                # 处理PDF文件：渲染结果直接作为图片数据返回，不再经过PIL解码、重新编码和磁盘读写
+                image_bytes = await asyncio.to_thread(self._render_first_page, file_path)
                 
-            elif file_ext in ['.doc', '.docx']:
+            elif file_ext in WORD_EXTENSIONS:
                 # 处理Word文档 - 先转换为PDF再转换为图片
                 # 使用python-docx无法获得视觉效果，所以我们使用LibreOffice进行转换
+                # 已批量预转换的文档直接使用转换结果，否则单独转换
+                generated_pdf = self._converted_pdfs.pop(file_path, None)
+                if generated_pdf is None:
+                    # 同一用户配置下 LibreOffice 不能同时运行多个实例，转换需串行
+                    async with _get_soffice_lock():
+                        converted = await convert_docs_to_pdfs_batch([file_path], work_dir)
+                    generated_pdf = converted.get(file_path)
                 
-                # 首先尝试转换为PDF
-                temp_pdf_path = os.path.join(output_dir, f"{file_stem}_temp.pdf")
-                
-                # 使用LibreOffice命令行工具转换（需要系统安装LibreOffice）
-                import subprocess
-                try:
-                    subprocess.run([
-                        'soffice', '--headless', '--convert-to', 'pdf', 
-                        '--outdir', output_dir, file_path
-                    ], check=True, capture_output=True)
-                    
+                if generated_pdf:
                     # 转换生成的PDF为图片
-                    generated_pdf = os.path.join(output_dir, f"{file_stem}.pdf")
-                    if os.path.exists(generated_pdf):
-                        pdf_doc = fitz.open(generated_pdf)
-                        page = pdf_doc[0]
-                        mat = fitz.Matrix(2.0, 2.0)
-                        pix = page.get_pixmap(matrix=mat)
-                        img_data = pix.tobytes("png")
-                        img = Image.open(BytesIO(img_data))
-                        pdf_doc.close()
+                    try:
+                        image_bytes = await asyncio.to_thread(self._render_first_page, generated_pdf)
+                    finally:
                         # 清理临时PDF文件
                         os.remove(generated_pdf)
-                    else:
-                        raise Exception("LibreOffice转换PDF失败")
-                        
-                except (subprocess.CalledProcessError, FileNotFoundError):
-                    # LibreOffice不可用，尝试直接使用python-docx提取内容并生成简单图片
+                else:
+                    # LibreOffice不可用或转换失败，尝试直接使用python-docx提取内容并生成简单图片
                     print("⚠️ LibreOffice不可用，使用备用方案生成文档预览")
-                    img = self._create_text_image_from_docx(file_path)
+                    image_bytes = await asyncio.to_thread(self._text_image_bytes_from_docx, file_path)
                     
             else:
                 raise ValueError(f"不支持的文件格式: {file_ext}")
             
-            # 保存图片
-            img.save(output_path, "PNG", quality=95)
-            
-            print(f"✅ 文档转换完成: {output_path}")
-            return output_path
+            print(f"✅ 文档转换完成: {file_path}")
+            return image_bytes
             
         except Exception as e:
             print(f"❌ 文档转换失败: {e}")
             raise
     
-    def _create_text_image_from_docx(self, docx_path: str) -> Image.Image:
+    async def preconvert_word_documents(self, file_paths: list, work_dir: str = "temp_images"):
+        """
+        批量预转换Word文档为PDF，整批只启动一次 LibreOffice
+        
+        之后对这些文档调用 convert_document_to_image_bytes 时直接使用转换结果。
+        文件名（不含扩展名）重复的文档留待单独转换，避免输出的PDF互相覆盖。
+        
+        Args:
+            file_paths: 文档路径列表，非Word文档会被忽略
+            work_dir: PDF输出目录
+        """
+        word_paths = []
+        seen_stems = set()
+        for path in file_paths:
+            if not path or Path(path).suffix.lower() not in WORD_EXTENSIONS or not os.path.exists(path):
+                continue
+            stem = Path(path).stem
+            if path in self._converted_pdfs or stem in seen_stems:
+                continue
+            seen_stems.add(stem)
+            word_paths.append(path)
+        
+        if not word_paths:
+            return
+        
+        async with _get_soffice_lock():
+            converted = await convert_docs_to_pdfs_batch(word_paths, work_dir)
+        self._converted_pdfs.update(converted)
+        print(f"✅ 批量转换Word文档完成: {len(converted)}/{len(word_paths)}")
+    
+    def _discard_converted_pdf(self, file_path: str):
+        """删除不再需要的预转换PDF"""
+        pdf_path = self._converted_pdfs.pop(file_path, None)
+        if pdf_path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+    
+    async def convert_document_to_image(self, file_path: str, output_dir: str = "temp_images") -> str:
+        """
+        将文档转换为高清图片并保存到磁盘（便于查看转换效果；校验流程直接使用内存中的图片数据）
+        
+        Args:
+            file_path: 文档文件路径
+            output_dir: 图片输出目录
+            
+        Returns:
+            str: 生成的图片路径
+            
+        Raises:
+            ValueError: 不支持的文件格式
+            Exception: 文档转换失败
+        """
+        # 创建输出目录
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"{Path(file_path).stem}.jpg")
+        
+        image_bytes = await self.convert_document_to_image_bytes(file_path, output_dir)
+        with open(output_path, "wb") as image_file:
+            image_file.write(image_bytes)
+        return output_path
+    
+    def _text_image_bytes_from_docx(self, docx_path: str) -> bytes:
+        """
+        从DOCX文件生成文本预览图片并编码为JPEG（备用方案）
+        
+        Args:
+            docx_path: DOCX文件路径
+            
+        Returns:
+            bytes: JPEG图片数据
+        """
+        img = self._create_text_image_from_docx(docx_path)
+        buffer = BytesIO()
+        img.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return buffer.getvalue()
+    
+    def _create_text_image_from_docx(self, docx_path: str) -> "Image.Image":
         """
         从DOCX文件创建简单的文本图片（备用方案）
         
@@ -189,6 +531,10 @@ class DocumentValidator:
         Returns:
             PIL.Image: 生成的图片
         """
+        # 只有备用方案需要绘图和读取 docx，PIL 与 python-docx 在这里才导入
+        from PIL import Image, ImageDraw, ImageFont
+        from docx import Document  # 这个是 python-docx 包引入的
+        
         try:
             
             
@@ -246,18 +592,43 @@ class DocumentValidator:
             draw.text((50, 50), f"无法读取文档内容: {os.path.basename(docx_path)}", fill='black')
             return img
     
-    def _encode_image_to_base64(self, image_path: str) -> str:
+    def _encode_bytes_to_base64(self, image_bytes: bytes) -> str:
         """
-        将图片编码为base64字符串
+        将图片数据编码为base64字符串
         
         Args:
-            image_path: 图片路径
+            image_bytes: 图片数据
             
         Returns:
             str: base64编码的图片数据
         """
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+        return base64.b64encode(image_bytes).decode('ascii')
+    
+    async def _load_image_base64(self, file_path: str) -> str:
+        """
+        转换文档并编码为base64，原始图片数据在编码后即可释放，不会与编码结果一起保留到校验结束
+        
+        文件未改动（路径、修改时间、大小均相同）时直接复用进程内已编码的结果
+        
+        Args:
+            file_path: 文档文件路径
+            
+        Returns:
+            str: base64编码的图片数据
+        """
+        stat = os.stat(file_path)
+        signature = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        image_b64 = self._b64_cache.get(signature)
+        if image_b64 is not None:
+            self._b64_cache.move_to_end(signature)
+            self._discard_converted_pdf(file_path)
+            return image_b64
+        
+        image_b64 = self._encode_bytes_to_base64(await self.convert_document_to_image_bytes(file_path))
+        self._b64_cache[signature] = image_b64
+        if len(self._b64_cache) > IMAGE_CACHE_SIZE:
+            self._b64_cache.popitem(last=False)
+        return image_b64
     
     async def validate_documents(
         self, 
@@ -280,6 +651,9 @@ class DocumentValidator:
         
         # 检查OpenAI客户端是否可用
         if not self.client:
+            # 不会再渲染这两个文档，预转换的PDF在此删除
+            self._discard_converted_pdf(blank_form_path)
+            self._discard_converted_pdf(sample_form_path)
             error_msg = "OpenAI客户端不可用，无法进行文档校验"
             result.forms_consistent_reason = error_msg
             result.blank_form_matches_reason = error_msg
@@ -289,16 +663,28 @@ class DocumentValidator:
             result.sample_info_masked_reason = error_msg
             return result
         
+        # 相同材料、相同文档内容的校验结果直接复用缓存
+        blank_form_path = blank_form_path if blank_form_path and os.path.exists(blank_form_path) else None
+        sample_form_path = sample_form_path if sample_form_path and os.path.exists(sample_form_path) else None
+        # 计算文档内容哈希需要读取整个文件，放到线程中执行，不阻塞其他并发中的校验请求
+        cache_key = await asyncio.to_thread(
+            make_cache_key, material_name, f"{VISION_MODEL}:{PROMPT_VERSION}", blank_form_path, sample_form_path
+        )
+        cached = check_cache(cache_key)
+        if cached is not None:
+            print(f"♻️ 使用缓存的校验结果: {material_name}")
+            self._discard_converted_pdf(blank_form_path)
+            self._discard_converted_pdf(sample_form_path)
+            return ValidationResult(**cached)
+        
         try:
-            # 准备图片
-            images = {}
-            if blank_form_path and os.path.exists(blank_form_path):
-                blank_img_path = self.convert_document_to_image(blank_form_path)
-                images['blank'] = self._encode_image_to_base64(blank_img_path)
-                
-            if sample_form_path and os.path.exists(sample_form_path):
-                sample_img_path = self.convert_document_to_image(sample_form_path)
-                images['sample'] = self._encode_image_to_base64(sample_img_path)
+            # 准备图片：两个文档同时转换
+            doc_paths = {'blank': blank_form_path, 'sample': sample_form_path}
+            doc_paths = {kind: path for kind, path in doc_paths.items() if path}
+            encoded_images = await asyncio.gather(*(
+                self._load_image_base64(path) for path in doc_paths.values()
+            ))
+            images = dict(zip(doc_paths, encoded_images))
             
             # 根据可用的文档进行不同的校验
             if 'blank' in images and 'sample' in images:
@@ -313,17 +699,6 @@ class DocumentValidator:
                 # 只有示例样表
                 await self._validate_sample_document(result, material_name, images['sample'])
             
-            # 清理临时图片文件
-            # if 'blank' in images:
-            #     temp_blank_path = blank_img_path
-            #     if os.path.exists(temp_blank_path):
-            #         os.remove(temp_blank_path)
-                    
-            # if 'sample' in images:
-            #     temp_sample_path = sample_img_path
-            #     if os.path.exists(temp_sample_path):
-            #         os.remove(temp_sample_path)
-            
         except Exception as e:
             print(f"❌ 文档校验出错: {e}")
             # 所有校验结果都设为None，并记录错误信息
@@ -334,6 +709,13 @@ class DocumentValidator:
             result.sample_form_filled_reason = f"校验出错: {e}"
             result.sample_info_masked_reason = f"校验出错: {e}"
         
+        # 只缓存得到了模型判断的结果，API调用或解析失败时判断值全部为 None，下次重新校验
+        if any(getattr(result, field_name) is not None for field_name, _ in self._RESULT_FIELDS):
+            try:
+                save_to_cache(cache_key, asdict(result))
+            except OSError as e:
+                print(f"⚠️ 保存校验结果缓存失败: {e}")
+        
         return result
     
     async def _validate_both_documents(
@@ -346,39 +728,7 @@ class DocumentValidator:
         """
         校验两个文档（空白表格和示例样表）
         """
-        prompt = f"""
-你是一位专业的政务材料审查员。请仔细分析下面两张文档图片，进行全面校验。
-
-# 输入信息
-- 材料名称: "{material_name}"
-- 图片A: 空白表格
-- 图片B: 示例样表
-
-# 校验任务
-请对以下6个方面进行校验，并给出明确的true/false判断：
-
-1. `consistency`: 空白表格和示例样表在整体布局、结构、表格项目和样式上是否基本一致？它们看起来应该是同一个模板的两种状态（一个未填写，一个已填写）。
-2. `blank_form_matches`: 请宽松判断：空白表格的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
-3. `sample_form_matches`: 请宽松判断：示例样表的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
-4. `blank_form_has_no_samples`: 空白表格中是否不包含任何个人信息填写示例？表格应该是干净的、待填写的状态。
-5. `sample_form_has_samples`: 示例样表中是否清晰地包含了填写示例？
-6. `sample_info_masked`: 示例样表中的个人信息（姓名、电话、地址等）是否已经打码处理？（如"张xx"、"139xxxx"等）
-
-# 输出格式 (严格JSON格式)
-{{
-  "forms_consistent": true,
-  "forms_consistent_reason": "详细说明判断理由",
-  "blank_form_matches": true,
-  "blank_form_matches_reason": "详细说明判断理由",
-  "sample_form_matches": true,
-  "sample_form_matches_reason": "详细说明判断理由",
-  "blank_form_empty": true,
-  "blank_form_empty_reason": "详细说明判断理由",
-  "sample_form_filled": true,
-  "sample_form_filled_reason": "详细说明判断理由",
-  "sample_info_masked": true,
-  "sample_info_masked_reason": "详细说明判断理由"
-}}"""
+        prompt = material_name.join(BOTH_PROMPT_PARTS)
         
         messages = [
             {
@@ -391,14 +741,14 @@ class DocumentValidator:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{blank_image_b64}",
+                            "url": f"data:image/jpeg;base64,{blank_image_b64}",
                             "detail": "high"
                         }
                     },
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{sample_image_b64}",
+                            "url": f"data:image/jpeg;base64,{sample_image_b64}",
                             "detail": "high"
                         }
                     }
@@ -407,15 +757,9 @@ class DocumentValidator:
         ]
         
         try:
-            response = await self.client.chat.completions.create(
-                model="qwen-vl-max-latest",  # 使用支持视觉的模型
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.1
-            )
+            content = await self._create_completion(messages, max_tokens=1000)
             
             # 解析响应
-            content = response.choices[0].message.content
             print("ai调用成功，开始解析响应")
             await self._parse_validation_response(result, content)
             
@@ -438,29 +782,7 @@ class DocumentValidator:
         """
         校验单个空白表格文档
         """
-        prompt = f"""
-        你是一位专业的政务材料审查员。请仔细分析下面的文档图片，进行全面校验。
-        
-        # 输入信息
-        - 材料名称: "{material_name}"
-        - 文档类型: 空白表格
-        
-        # 校验图片
-        <image>
-        
-        # 校验要求
-        请对以下3个方面进行校验，并给出明确的true/false判断：
-        
-        1. `blank_form_matches`: 请宽松判断：空白表格的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
-        2. `blank_form_has_no_samples`: 空白表格中是否不包含任何个人信息填写示例？表格应该是干净的、待填写的状态。
-        
-        # 输出格式
-{{
-  "blank_form_matches": true,
-  "blank_form_matches_reason": "详细说明判断理由",
-  "blank_form_empty": true,
-  "blank_form_empty_reason": "详细说明判断理由"
-}}"""
+        prompt = material_name.join(BLANK_PROMPT_PARTS)
         
         messages = [
             {
@@ -473,7 +795,7 @@ class DocumentValidator:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{blank_image_b64}",
+                            "url": f"data:image/jpeg;base64,{blank_image_b64}",
                             "detail": "high"
                         }
                     }
@@ -482,14 +804,7 @@ class DocumentValidator:
         ]
         
         try:
-            response = await self.client.chat.completions.create(
-                model="qwen-vl-max-latest",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.1
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._create_completion(messages, max_tokens=500)
             await self._parse_validation_response(result, content)
             
         except Exception as e:
@@ -507,32 +822,7 @@ class DocumentValidator:
         """
         校验单个示例样表文档
         """
-        prompt = f"""
-        你是一位专业的政务材料审查员。请仔细分析下面的文档图片，进行全面校验。
-        
-        # 输入信息
-        - 材料名称: "{material_name}"
-        - 文档类型: 示例样表
-        
-        # 校验图片
-        <image>
-        
-        # 校验要求
-        请对以下3个方面进行校验，并给出明确的true/false判断：
-        
-        1. `sample_form_matches`: 请宽松判断：示例样表的主旨是否与材料名称“{material_name}”的核心主题紧密相关？例如，如果材料名称是“体检合格证明”，表格标题是“教师资格申请人员体检表”也应视为相符，因为它们都围绕“体检”这一核心主题。（判断标准：主题相关即可，无需文字完全匹配）
-        2. `sample_form_has_samples`: 示例样表中是否清晰地包含了填写示例？
-        3. `sample_info_masked`: 示例样表中的个人信息（姓名、电话、地址等）是否已经打码处理？（如"张xx"、"139xxxx"等）
-        
-        # 输出格式
-{{
-  "sample_form_matches": true,
-  "sample_form_matches_reason": "详细说明判断理由",
-  "sample_form_filled": true,
-  "sample_form_filled_reason": "详细说明判断理由",
-  "sample_info_masked": true,
-  "sample_info_masked_reason": "详细说明判断理由"
-}}"""
+        prompt = material_name.join(SAMPLE_PROMPT_PARTS)
         
         messages = [
             {
@@ -545,7 +835,7 @@ class DocumentValidator:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{sample_image_b64}",
+                            "url": f"data:image/jpeg;base64,{sample_image_b64}",
                             "detail": "high"
                         }
                     }
@@ -554,14 +844,7 @@ class DocumentValidator:
         ]
         
         try:
-            response = await self.client.chat.completions.create(
-                model="qwen-vl-max-latest",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.1
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._create_completion(messages, max_tokens=500)
             await self._parse_validation_response(result, content)
             
         except Exception as e:
@@ -576,61 +859,24 @@ class DocumentValidator:
         解析OpenAI API响应并更新ValidationResult
         """
         try:
-            import json
-            
-            # 尝试提取JSON部分
-            if "```json" in content:
-                json_start = content.find("```json") + 7
-                json_end = content.find("```", json_start)
-                json_content = content[json_start:json_end].strip()
-            elif "{" in content and "}" in content:
-                json_start = content.find("{")
-                json_end = content.rfind("}") + 1
-                json_content = content[json_start:json_end]
-            else:
-                json_content = content
+            # 一次扫描提取JSON部分
+            match = JSON_OBJECT_PATTERN.search(content)
+            if not match:
+                raise ValueError("响应中未找到JSON对象")
             
             # 解析JSON
-            data = json.loads(json_content)
+            data = json_loads(match.group(0))
             
-            # 更新结果
-            if "forms_consistent" in data:
-                result.forms_consistent = data["forms_consistent"]
-                result.forms_consistent_reason = data.get("forms_consistent_reason", "")
-                
-            if "blank_form_matches" in data:
-                result.blank_form_matches = data["blank_form_matches"]
-                result.blank_form_matches_reason = data.get("blank_form_matches_reason", "")
-                
-            if "sample_form_matches" in data:
-                result.sample_form_matches = data["sample_form_matches"]
-                result.sample_form_matches_reason = data.get("sample_form_matches_reason", "")
-                
-            if "blank_form_empty" in data:
-                result.blank_form_empty = data["blank_form_empty"]
-                result.blank_form_empty_reason = data.get("blank_form_empty_reason", "")
-                
-            if "sample_form_filled" in data:
-                result.sample_form_filled = data["sample_form_filled"]
-                result.sample_form_filled_reason = data.get("sample_form_filled_reason", "")
-                
-            if "sample_info_masked" in data:
-                result.sample_info_masked = data["sample_info_masked"]
-                result.sample_info_masked_reason = data.get("sample_info_masked_reason", "")
+            # 更新结果：响应中出现的判断项连同理由一起写入
+            for field_name, reason_name in self._RESULT_FIELDS:
+                if field_name in data:
+                    setattr(result, field_name, data[field_name])
+                    setattr(result, reason_name, data.get(reason_name, ""))
             
         except Exception as e:
             print(f"❌ 解析API响应失败: {e}")
             print(f"原始响应: {content}")
             error_msg = f"解析响应失败: {e}"
-            if result.forms_consistent_reason == "":
-                result.forms_consistent_reason = error_msg
-            if result.blank_form_matches_reason == "":
-                result.blank_form_matches_reason = error_msg
-            if result.sample_form_matches_reason == "":
-                result.sample_form_matches_reason = error_msg
-            if result.blank_form_empty_reason == "":
-                result.blank_form_empty_reason = error_msg
-            if result.sample_form_filled_reason == "":
-                result.sample_form_filled_reason = error_msg
-            if result.sample_info_masked_reason == "":
-                result.sample_info_masked_reason = error_msg
+            for _, reason_name in self._RESULT_FIELDS:
+                if getattr(result, reason_name) == "":
+                    setattr(result, reason_name, error_msg)
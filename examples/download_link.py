@@ -5,206 +5,344 @@ Playwright 下载功能演示
 该脚本演示了如何自动化以下流程：
 1. 访问指定的政务服务网站页面。
 2. 检查页面是否可访问。
-3. 定位到包含特定文本（“体检合格证明”）的表格行。
+3. 定位到包含材料名称（如“体检合格证明”）的表格行。
 4. 在该行内找到“空白表格”和“示例样表”的下载链接。
 5. 监听下载事件，并点击链接以下载文件。
 6. 将下载的文件保存到本地。
+
+多个材料共用一个浏览器和上下文，每个材料使用独立页面并发下载。
+链接为普通 href 的材料会记录下载地址，之后的运行直接用 httpx 下载，
+仅在地址缺失或直接下载失败（如需要会话 Cookie）时才启动浏览器。
 """
 import asyncio
+import json
 import os
-from playwright.async_api import async_playwright, expect
+import re
+from urllib.parse import parse_qs, unquote, urlparse
 
-async def main():
-    """主执行函数"""
+import httpx
+from playwright.async_api import async_playwright
+
+# 默认无头模式运行，设置环境变量 PLAYWRIGHT_HEADFUL=1 可显示浏览器窗口便于调试
+HEADLESS = not os.environ.get("PLAYWRIGHT_HEADFUL")
+
+# 同时下载的材料数上限
+MAX_CONCURRENT_DOWNLOADS = 6
+
+# 脚本只需要页面中的链接元素，这些资源类型直接中止以减少页面加载时间和流量；
+# 保留 document/script/xhr/fetch，保证由 JS 触发的下载仍然可用
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+async def block_heavy_resources(route):
+    """中止非必要资源请求，其余请求正常放行"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+# 下载文件保存的目录，每个材料一个子目录，避免同名文件互相覆盖
+DOWNLOAD_DIR = "downloads"
+
+# 记录可直接下载的链接地址，键为页面的 iddept_ql_inf 与材料名称
+URL_CACHE_FILE = os.path.join(DOWNLOAD_DIR, "download_urls.json")
+
+# 从 Content-Disposition 中解析文件名
+CONTENT_DISPOSITION_PATTERN = re.compile(
+    r"filename\*=(?:UTF-8'')?([^;]+)|filename=\"?([^\";]+)\"?", re.IGNORECASE
+)
+
+# 待下载的材料：(办事指南页面URL, 材料名称)
+MATERIALS = [
+    (
+        "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002",
+        "体检合格证明",
+    ),
+]
+
+# 在页面内一次性找到材料所在行并选出两个下载链接（优先 class 为 kbbg 的链接），
+# 找不到时返回 null 供 wait_for_function 继续轮询
+FIND_DOWNLOAD_LINKS_JS = """
+(material) => {
+    const row = [...document.querySelectorAll('tr')].find(
+        r => r.innerText.includes(material) && r.innerText.includes('空白表格'));
+    if (!row) return null;
+    const anchors = [...row.querySelectorAll('a')];
+    const pick = (text) => {
+        const matches = anchors.filter(a => a.textContent.includes(text));
+        return [matches, matches.find(a => a.classList.contains('kbbg')) || matches[0]];
+    };
+    const [blanks, blank] = pick('空白表格');
+    const [samples, sample] = pick('示例样表');
+    if (!blank || !sample) return null;
+    const describe = (a) => ({href: a.href, cls: a.className, onclick: a.getAttribute('onclick')});
+    return {
+        blank,
+        sample,
+        info: {
+            blankCount: blanks.length,
+            sampleCount: samples.length,
+            blank: describe(blank),
+            sample: describe(sample),
+        },
+    };
+}
+"""
+
+# 定位失败时收集所有包含材料名称的行文本，便于调试
+MATERIAL_ROW_TEXTS_JS = """
+(material) => [...document.querySelectorAll('tr')]
+    .filter(r => r.innerText.includes(material))
+    .map(r => r.innerText.slice(0, 100))
+"""
+
+def load_url_cache():
+    """读取已记录的下载地址，文件不存在或损坏时返回空字典"""
+    try:
+        with open(URL_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_url_cache(url_cache):
+    """保存下载地址记录"""
+    with open(URL_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(url_cache, f, ensure_ascii=False, indent=2)
+
+def url_cache_key(url, material_name):
+    """以页面URL中的 iddept_ql_inf（缺失时用完整URL）和材料名称作为记录的键"""
+    page_id = parse_qs(urlparse(url).query).get("iddept_ql_inf", [url])[0]
+    return f"{page_id}:{material_name}"
+
+def direct_link_url(link):
+    """链接为普通 href 时返回下载地址；由 onclick 或 javascript: 触发的链接返回 None"""
+    href = link["href"] or ""
+    if link["onclick"] or not href.startswith(("http://", "https://")) or "#" in href:
+        return None
+    return href
+
+def filename_from_response(response, fallback):
+    """从响应头或URL路径中取文件名"""
+    match = CONTENT_DISPOSITION_PATTERN.search(response.headers.get("content-disposition", ""))
+    if match:
+        name = unquote((match.group(1) or match.group(2)).strip().strip('"'))
+    else:
+        name = unquote(os.path.basename(response.url.path))
+    return os.path.basename(name) or fallback
+
+async def fetch_file(client, url, save_dir, label):
+    """直接请求下载地址并保存文件，返回保存路径；返回网页或请求失败时返回 None"""
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"⚠️  直接下载'{label}'失败: {e}")
+        return None
     
-    # 定义下载文件保存的目录
-    download_dir = "downloads"
-    os.makedirs(download_dir, exist_ok=True)
-    print(f"📁 文件将下载到: {os.path.abspath(download_dir)}")
+    # 需要登录会话时服务器通常返回网页而不是文件
+    if response.headers.get("content-type", "").startswith("text/html"):
+        print(f"⚠️  直接下载'{label}'返回了网页，改用浏览器下载")
+        return None
     
-    async with async_playwright() as p:
-        # 启动浏览器，headless=False 可以显示浏览器界面，便于调试
-        browser = await p.chromium.launch(headless=False)
+    file_path = os.path.join(save_dir, filename_from_response(response, label))
+    with open(file_path, "wb") as f:
+        f.write(response.content)
+    print(f"✅ '{label}'直接下载成功! 文件保存在: {file_path}")
+    return file_path
+
+async def fetch_material(client, entry, material_name):
+    """
+    使用记录的地址直接下载一个材料的两个文件
+    
+    Returns:
+        dict: 与 download_material 相同结构的结果；任一文件下载失败时返回 None
+    """
+    save_dir = os.path.join(DOWNLOAD_DIR, material_name)
+    os.makedirs(save_dir, exist_ok=True)
+    blank, sample = await asyncio.gather(
+        fetch_file(client, entry["blank_url"], save_dir, "空白表格"),
+        fetch_file(client, entry["sample_url"], save_dir, "示例样表"),
+    )
+    if not (blank and sample):
+        return None
+    return {"material": material_name, "blank": blank, "sample": sample,
+            "blank_url": entry["blank_url"], "sample_url": entry["sample_url"]}
+
+async def download_file(page, link, save_dir, label):
+    """点击链接并保存下载的文件，返回保存路径，失败时返回 None"""
+    print(f"📥 准备下载'{label}'...")
+    try:
+        # page.expect_download() 会创建一个监听器，等待下载事件发生
+        async with page.expect_download() as download_info:
+            # 在页面内直接点击已取得的链接句柄以触发下载
+            await page.evaluate("a => a.click()", link)
         
-        # 创建一个新的浏览器上下文，并启用接受下载
-        context = await browser.new_context(accept_downloads=True)
-        page = await context.new_page()
+        download = await download_info.value
         
-        # 目标页面的URL
-        url = "https://sz.jszwfw.gov.cn/jszwfw/bscx/itemlist/bszn.do?webId=3&iddept_yw_inf=113205000141492526332010502800201&ql_kind=01&iddept_ql_inf=1132050001414925263320105028002"
+        # 构建保存路径并保存文件
+        file_path = os.path.join(save_dir, download.suggested_filename)
+        await download.save_as(file_path)
+        print(f"✅ '{label}'下载成功! 文件保存在: {file_path}")
+        return file_path
         
+    except Exception as e:
+        print(f"❌ 下载'{label}'时发生错误: {e}")
+        return None
+
+async def download_material(context, url, material_name):
+    """
+    在共享的浏览器上下文中打开新页面，下载一个材料的空白表格和示例样表
+    
+    Returns:
+        dict: 材料名称及两个文件的保存路径，下载失败的文件为 None
+    """
+    save_dir = os.path.join(DOWNLOAD_DIR, material_name)
+    os.makedirs(save_dir, exist_ok=True)
+    result = {"material": material_name, "blank": None, "sample": None,
+              "blank_url": None, "sample_url": None}
+    
+    page = await context.new_page()
+    try:
         # --- 1. 检查页面可访问性 ---
-        print(f"\n🚀 正在导航到页面: {url}")
+        print(f"\n🚀 [{material_name}] 正在导航到页面: {url}")
         try:
             # 使用 goto 方法访问页面，并设置较长的超时时间
             response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
             
             # 检查HTTP响应状态
             if response and response.ok:
-                print(f"✅ 页面加载成功! 状态码: {response.status}")
+                print(f"✅ [{material_name}] 页面加载成功! 状态码: {response.status}")
             else:
-                print(f"❌ 页面加载失败! 状态码: {response.status if response else '无响应'}")
-                await browser.close()
-                return
+                print(f"❌ [{material_name}] 页面加载失败! 状态码: {response.status if response else '无响应'}")
+                return result
         except Exception as e:
-            print(f"❌ 导航到页面时发生错误: {e}")
-            await browser.close()
-            return
+            print(f"❌ [{material_name}] 导航到页面时发生错误: {e}")
+            return result
             
         # --- 2. 定位目标元素 ---
-        print("\n🔍 正在定位'体检合格证明'所在的行...")
+        print(f"🔍 正在定位'{material_name}'所在的行及其下载链接...")
         try:
-            # 使用更精确的定位策略：定位到同时包含"体检合格证明"和"空白表格"的行
-            # 这样可以避免误选到表头行
-            target_row = page.locator("tr:has-text('体检合格证明'):has-text('空白表格')")
-            
-            # 如果上述定位器仍然找不到，尝试备用方案
-            row_count = await target_row.count()
-            if row_count == 0:
-                print("🔄 尝试备用定位方案...")
-                # 方案2：通过class属性定位（从错误信息看到有tsize类）
-                target_row = page.locator("tr.tsize:has-text('体检合格证明')")
-                row_count = await target_row.count()
-                
-            if row_count == 0:
-                print("🔄 尝试第三种定位方案...")
-                # 方案3：先找到所有包含"体检合格证明"的行，然后选择包含链接的那一行
-                all_rows = page.locator("tr:has-text('体检合格证明')")
-                for i in range(await all_rows.count()):
-                    row = all_rows.nth(i)
-                    # 检查这一行是否包含"空白表格"链接
-                    link_count = await row.locator("a:has-text('空白表格')").count()
-                    if link_count > 0:
-                        target_row = row
-                        break
-                        
-            # 使用expect断言，等待该行元素在10秒内变为可见状态
-            await expect(target_row).to_be_visible(timeout=10000)
-            # await page.screenshot(path="screenshots/location_success.png", full_page=True)
-            print("✅ 成功定位到目标行。")
+            # 在页面内一次完成查找，行出现前由 wait_for_function 轮询，返回值即链接句柄
+            links_handle = await page.wait_for_function(
+                FIND_DOWNLOAD_LINKS_JS, arg=material_name, timeout=10000
+            )
+            links = await links_handle.get_properties()
+            blank_form_link = links["blank"].as_element()
+            sample_form_link = links["sample"].as_element()
+            info = await links["info"].json_value()
+            print(f"✅ 成功定位到'{material_name}'所在行。")
         except Exception as e:
-            print(f"❌ 定位目标行失败: {e}")
+            print(f"❌ 定位'{material_name}'所在行失败: {e}")
             
             # 保存调试信息
             print("🔧 正在收集调试信息...")
             try:
-                # 查找所有包含"体检合格证明"的行
-                all_health_rows = page.locator("tr:has-text('体检合格证明')")
-                health_count = await all_health_rows.count()
-                print(f"📊 找到 {health_count} 个包含'体检合格证明'的行")
+                # 查找所有包含材料名称的行
+                row_texts = await page.evaluate(MATERIAL_ROW_TEXTS_JS, material_name)
+                print(f"📊 找到 {len(row_texts)} 个包含'{material_name}'的行")
                 
-                for i in range(health_count):
-                    row = all_health_rows.nth(i)
-                    row_text = await row.text_content()
-                    print(f"   行 {i+1}: {row_text[:100]}...")
+                for i, row_text in enumerate(row_texts):
+                    print(f"   行 {i+1}: {row_text}...")
                     
             except Exception as debug_e:
                 print(f"⚠️  调试信息收集失败: {debug_e}")
                 
-            await page.screenshot(path="screenshots/error_location_failed.png", full_page=True)
-            print("📸 已保存错误截图: screenshots/error_location_failed.png")
-            await browser.close()
-            return
+            screenshot_path = f"screenshots/error_location_failed_{material_name}.png"
+            await page.screenshot(path=screenshot_path, full_page=True)
+            print(f"📸 已保存错误截图: {screenshot_path}")
+            return result
             
-        # 在已定位的行内查找下载链接
-        print("🔍 正在行内查找'空白表格'和'示例样表'链接...")
-        
-        # 检查有多少个"空白表格"链接
-        blank_form_links = target_row.locator("a:text('空白表格')")
-        blank_form_count = await blank_form_links.count()
-        print(f"📋 找到 {blank_form_count} 个'空白表格'链接")
-        
-        # 检查有多少个"示例样表"链接  
-        sample_form_links = target_row.locator("a:text('示例样表')")
-        sample_form_count = await sample_form_links.count()
-        print(f"📄 找到 {sample_form_count} 个'示例样表'链接")
-        
-        # 如果有多个链接，选择第一个或者根据class属性选择
-        if blank_form_count > 1:
-            print("🔧 发现多个'空白表格'链接，尝试选择合适的链接...")
-            # 优先选择class为"kbbg"的链接（通常是主要链接）
-            blank_form_link = target_row.locator("a.kbbg:text('空白表格')")
-            if await blank_form_link.count() == 0:
-                # 如果没找到，就选择第一个
-                blank_form_link = blank_form_links.first
-        else:
-            blank_form_link = blank_form_links
-            
-        if sample_form_count > 1:
-            print("🔧 发现多个'示例样表'链接，尝试选择合适的链接...")
-            # 优先选择class为"kbbg"的链接
-            sample_form_link = target_row.locator("a.kbbg:text('示例样表')")
-            if await sample_form_link.count() == 0:
-                # 如果没找到，就选择第一个
-                sample_form_link = sample_form_links.first
-        else:
-            sample_form_link = sample_form_links
-        
-        # 确认链接可见
-        try:
-            await expect(blank_form_link).to_be_visible(timeout=5000)
-            await expect(sample_form_link).to_be_visible(timeout=5000)
-            print("✅ 成功定位到下载链接。")
-        except Exception as e:
-            print(f"⚠️  链接可见性检查失败: {e}")
-            # 打印链接详细信息帮助调试
-            try:
-                for i in range(blank_form_count):
-                    link = blank_form_links.nth(i)
-                    class_name = await link.get_attribute("class")
-                    href = await link.get_attribute("href")
-                    onclick = await link.get_attribute("onclick")
-                    print(f"   空白表格链接 {i+1}: class='{class_name}', href='{href}', onclick存在={onclick is not None}")
-                
-                for i in range(sample_form_count):
-                    link = sample_form_links.nth(i)
-                    class_name = await link.get_attribute("class")
-                    href = await link.get_attribute("href")
-                    onclick = await link.get_attribute("onclick")
-                    print(f"   示例样表链接 {i+1}: class='{class_name}', href='{href}', onclick存在={onclick is not None}")
-            except Exception:
-                pass
-            raise
+        print(f"📋 找到 {info['blankCount']} 个'空白表格'链接")
+        print(f"📄 找到 {info['sampleCount']} 个'示例样表'链接")
+        for label, link in (("空白表格", info["blank"]), ("示例样表", info["sample"])):
+            print(f"   {label}链接: class='{link['cls']}', href='{link['href']}', onclick存在={link['onclick'] is not None}")
+        result["blank_url"] = direct_link_url(info["blank"])
+        result["sample_url"] = direct_link_url(info["sample"])
         
         # --- 3. 执行并验证下载 ---
-        
-        # 下载 "空白表格"
-        print("\n📥 准备下载'空白表格'...")
-        try:
-            # page.expect_download() 会创建一个监听器，等待下载事件发生
-            async with page.expect_download() as download_info:
-                # 点击链接以触发下载
-                await blank_form_link.click()
-            
-            download = await download_info.value
-            
-            # 构建保存路径
-            file_path_blank = os.path.join(download_dir, download.suggested_filename)
-            
-            # 保存文件
-            await download.save_as(file_path_blank)
-            print(f"✅ '空白表格'下载成功! 文件保存在: {file_path_blank}")
-            
-        except Exception as e:
-            print(f"❌ 下载'空白表格'时发生错误: {e}")
+        # 同一页面上的两个下载依次进行，保证下载事件与点击一一对应
+        result["blank"] = await download_file(page, blank_form_link, save_dir, "空白表格")
+        result["sample"] = await download_file(page, sample_form_link, save_dir, "示例样表")
+        return result
+    finally:
+        await page.close()
 
-        # 下载 "示例样表"
-        print("\n📥 准备下载'示例样表'...")
+async def download_with_browser(items):
+    """启动一次浏览器，在共享的上下文中并发下载给定的材料"""
+    async with async_playwright() as p:
+        # 浏览器只启动一次，设置 PLAYWRIGHT_HEADFUL=1 可以显示浏览器界面，便于调试
+        browser = await p.chromium.launch(headless=HEADLESS)
         try:
-            async with page.expect_download() as download_info:
-                await sample_form_link.click()
+            # 所有材料共用一个启用下载的浏览器上下文
+            context = await browser.new_context(accept_downloads=True)
+            # 在上下文上注册一次拦截，所有材料页面共用
+            await context.route("**/*", block_heavy_resources)
             
-            download = await download_info.value
-            file_path_sample = os.path.join(download_dir, download.suggested_filename)
-            await download.save_as(file_path_sample)
-            print(f"✅ '示例样表'下载成功! 文件保存在: {file_path_sample}")
+            # 并发下载各材料，数量受信号量限制
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
             
-        except Exception as e:
-            print(f"❌ 下载'示例样表'时发生错误: {e}")
+            async def bounded_download(url, material_name):
+                async with semaphore:
+                    return await download_material(context, url, material_name)
+            
+            return await asyncio.gather(
+                *(bounded_download(url, name) for url, name in items),
+                return_exceptions=True,
+            )
+        finally:
+            print("\n🧹 关闭浏览器。")
+            await browser.close()
 
-        # --- 4. 清理 ---
-        print("\n🎉 任务完成，关闭浏览器。")
-        await browser.close()
+async def main():
+    """主执行函数"""
+    
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    os.makedirs("screenshots", exist_ok=True)
+    print(f"📁 文件将下载到: {os.path.abspath(DOWNLOAD_DIR)}")
+    
+    url_cache = load_url_cache()
+    results = {}
+    
+    # --- 先用记录的地址直接下载，无需启动浏览器 ---
+    cached = [(url, name) for url, name in MATERIALS if url_cache_key(url, name) in url_cache]
+    if cached:
+        print(f"\n⚡ {len(cached)} 个材料已有下载地址记录，直接下载...")
+        async with httpx.AsyncClient(http2=True, timeout=60, follow_redirects=True) as client:
+            fetched = await asyncio.gather(*(
+                fetch_material(client, url_cache[url_cache_key(url, name)], name)
+                for url, name in cached
+            ))
+        for (url, name), result in zip(cached, fetched):
+            if result:
+                results[(url, name)] = result
+    
+    # --- 其余材料（及直接下载失败的材料）使用浏览器下载 ---
+    remaining = [item for item in MATERIALS if item not in results]
+    if remaining:
+        browser_results = await download_with_browser(remaining)
+        results.update(zip(remaining, browser_results))
+    
+    # 记录两个链接均为普通 href 且下载成功的材料，供下次直接下载
+    for (url, name), result in results.items():
+        if isinstance(result, Exception):
+            continue
+        if result["blank"] and result["sample"] and result["blank_url"] and result["sample_url"]:
+            url_cache[url_cache_key(url, name)] = {
+                "blank_url": result["blank_url"],
+                "sample_url": result["sample_url"],
+            }
+    save_url_cache(url_cache)
+    
+    # --- 汇总 ---
+    print("\n📊 下载汇总:")
+    for item in MATERIALS:
+        material_name = item[1]
+        result = results[item]
+        if isinstance(result, Exception):
+            print(f"   ❌ {material_name}: {result}")
+        else:
+            ok = sum(1 for key in ("blank", "sample") if result[key])
+            print(f"   {'✅' if ok == 2 else '⚠️ '} {material_name}: {ok}/2 个文件")
+    print("\n🎉 任务完成。")
 
 if __name__ == "__main__":
     asyncio.run(main())
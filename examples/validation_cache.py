@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+文档校验结果缓存
+
+以文档内容哈希为键，将视觉模型的校验结果保存为 JSON 文件。
+同一份文档再次校验时直接复用结果，跳过图片转换和API调用。
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+# 缓存目录，每个键对应一个 JSON 文件
+CACHE_DIR = os.path.join("temp_images", ".cache")
+
+# 缓存有效期（秒）
+DEFAULT_TTL = 7 * 86400
+
+
+def file_digest(file_path: str) -> str:
+    """
+    计算文件内容的 SHA-256
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(material_name: str, prompt_version: str, *file_paths: Optional[str]) -> str:
+    """
+    由材料名称、提示词版本和各文档内容生成缓存键
+
+    Args:
+        material_name: 材料名称
+        prompt_version: 提示词版本，提示词变化时更换版本即可让旧缓存失效
+        *file_paths: 文档路径，缺失的文档传 None
+
+    Returns:
+        str: 缓存键
+    """
+    parts = [material_name, prompt_version]
+    parts.extend(file_digest(path) if path else "" for path in file_paths)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def check_cache(key: str) -> Optional[dict]:
+    """
+    读取缓存
+
+    Args:
+        key: 缓存键
+
+    Returns:
+        Optional[dict]: 缓存的值；不存在、已过期或无法读取时为 None
+    """
+    cache_path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("expires_at", 0) < time.time():
+        return None
+    return entry.get("value")
+
+
+def save_to_cache(key: str, value: dict, ttl: int = DEFAULT_TTL):
+    """
+    写入缓存，先写临时文件再替换，并发写入同一个键时不会产生损坏的文件
+
+    Args:
+        key: 缓存键
+        value: 可 JSON 序列化的值
+        ttl: 有效期（秒）
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(CACHE_DIR, f"{key}.json")
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"expires_at": time.time() + ttl, "value": value}, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
@@ -6,14 +6,14 @@ Playwright Demo 项目安装脚本
 import subprocess
 import sys
 
-def run_command(command):
-    """运行命令并打印输出"""
-    print(f"执行命令: {command}")
-    result = subprocess.run(command, shell=True, capture_output=True, text=True)
-    if result.stdout:
-        print(result.stdout)
-    if result.stderr:
-        print(result.stderr)
+def run_command(args):
+    """运行命令，输出直接显示在终端上"""
+    print(f"执行命令: {' '.join(args)}")
+    try:
+        result = subprocess.run(args)
+    except OSError as e:
+        print(f"无法执行命令: {e}")
+        return False
     return result.returncode == 0
 
 def main():
@@ -21,13 +21,13 @@ def main():
     
     # 安装 Python 依赖
     print("\n📦 安装 Python 依赖...")
-    if not run_command("pip install -r requirements.txt"):
+    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"]):
         print("❌ 安装 Python 依赖失败")
         sys.exit(1)
     
     # 安装浏览器
     print("\n🌐 安装浏览器...")
-    if not run_command("playwright install"):
+    if not run_command([sys.executable, "-m", "playwright", "install"]):
         print("❌ 安装浏览器失败")
         sys.exit(1)
     
@@ -2,32 +2,131 @@
 Pytest 配置文件
 定义测试夹具和全局配置
 """
-import pytest
-from playwright.async_api import async_playwright
 import asyncio
+import contextlib
+import os
+import re
+import sys
+
+import pytest
+
+try:
+    import uvloop
+    # uvloop 的事件循环调度开销更低，测试中大量的 CDP 通信直接受益
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # 未安装 uvloop（如 Windows）时使用默认事件循环
+    pass
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import create_browser_with_options, shutdown_playwright
+
+# 上下文池大小，测试依次执行时少量上下文即可循环复用
+CONTEXT_POOL_SIZE = min(os.cpu_count() or 1, 4)
+
+# 静态资源首次运行时录制到 HAR 文件，之后的运行直接回放，设置 PW_NO_CACHE=1 时不使用
+ASSET_HAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STATIC_ASSET_PATTERN = re.compile(r"\.(css|js|png|jpe?g|gif|svg|woff2?)(\?|$)")
+
+async def route_static_assets_from_har(context, index: int):
+    """
+    在上下文上按 HAR 文件录制/回放静态资源请求
+    
+    每个上下文使用各自的 HAR 文件，录制结果在上下文关闭时写入，不会互相覆盖；
+    回放时 HAR 中没有的请求照常访问网络
+    """
+    har_path = os.path.join(ASSET_HAR_DIR, f"assets_{index}.har")
+    update = not os.path.exists(har_path)
+    if update:
+        os.makedirs(ASSET_HAR_DIR, exist_ok=True)
+    await context.route_from_har(har_path, url=STATIC_ASSET_PATTERN, not_found="fallback", update=update)
+
+class ContextPool:
+    """
+    预先创建的上下文池，测试之间复用上下文，每个测试使用新建的页面
+    
+    页面级状态（route、事件监听器、视口、dialog 处理函数、页面 init script、sessionStorage）
+    随页面关闭一起丢弃；上下文级的 Cookie、权限、localStorage 和 IndexedDB 在归还时清除。
+    需要修改上下文本身（context.route、context.add_init_script 等）的测试应自建上下文，
+    参考 page_with_viewport 夹具。
+    """
+    
+    def __init__(self, contexts):
+        self._contexts = contexts
+        self._queue = asyncio.Queue()
+        for context in contexts:
+            self._queue.put_nowait(context)
+    
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        """取出一个上下文并新建页面，使用完毕后清除上下文状态并放回池中"""
+        context = await self._queue.get()
+        page = None
+        try:
+            page = await context.new_page()
+            yield page
+        finally:
+            try:
+                await self._reset(context, page)
+            finally:
+                self._queue.put_nowait(context)
+    
+    @staticmethod
+    async def _reset(context, page):
+        """清除测试留在上下文中的状态，然后关闭页面"""
+        await context.clear_cookies()
+        await context.clear_permissions()
+        if page is None:
+            return
+        origins = [origin["origin"] for origin in (await context.storage_state())["origins"]]
+        if origins:
+            # localStorage/IndexedDB 按源保存在上下文中，通过 CDP 按源清除，不必逐个打开页面
+            cdp = await context.new_cdp_session(page)
+            await asyncio.gather(*(
+                cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "local_storage,indexeddb"})
+                for origin in origins
+            ))
+            await cdp.detach()
+        await page.close()
+    
+    async def close(self):
+        """关闭池中所有上下文"""
+        await asyncio.gather(*(context.close() for context in self._contexts))
 
 @pytest.fixture(scope="session")
 def event_loop():
-    """创建事件循环"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """创建会话级事件循环，会话级的浏览器和页面池夹具在同一个循环中使用"""
+    policy = asyncio.get_event_loop_policy()
+    loop = policy.new_event_loop()
     yield loop
     loop.close()
 
 @pytest.fixture(scope="session")
 async def browser():
-    """浏览器会话级夹具"""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        yield browser
-        await browser.close()
+    """浏览器会话级夹具，从浏览器池获取，整个测试会话只启动一次"""
+    browser = await create_browser_with_options("chromium", headless=True)
+    yield browser
+    await shutdown_playwright()
+
+@pytest.fixture(scope="session")
+async def context_pool(browser):
+    """上下文池会话级夹具，上下文只在会话开始时创建一次"""
+    contexts = await asyncio.gather(*(browser.new_context() for _ in range(CONTEXT_POOL_SIZE)))
+    if not os.environ.get("PW_NO_CACHE"):
+        # 在上下文而不是页面上注册，主文档仍可使用浏览器的 HTTP 缓存
+        await asyncio.gather(*(
+            route_static_assets_from_har(context, i) for i, context in enumerate(contexts)
+        ))
+    pool = ContextPool(contexts)
+    yield pool
+    await pool.close()
 
 @pytest.fixture(scope="function")
-async def page(browser):
-    """页面函数级夹具"""
-    context = await browser.new_context()
-    page = await context.new_page()
-    yield page
-    await context.close()
+async def page(context_pool):
+    """页面函数级夹具，在池中的上下文里新建页面，测试结束后关闭"""
+    async with context_pool.acquire() as page:
+        yield page
 
 @pytest.fixture(scope="function")
 async def page_with_viewport(browser):
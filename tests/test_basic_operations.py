@@ -2,6 +2,8 @@
 基础操作测试用例
 测试页面导航、元素交互等基本功能
 """
+import asyncio
+
 import pytest
 from playwright.async_api import Page, expect
 
@@ -25,13 +27,13 @@ class TestBasicOperations:
         """测试元素可见性"""
         await page.goto("https://httpbin.org/")
         
-        # 检查主标题是否可见
+        # 主标题和导航链接互不依赖，同时检查是否可见
         main_heading = page.locator("h1")
-        await expect(main_heading).to_be_visible()
-        
-        # 检查导航链接
         links = page.locator("a")
-        await expect(links.first).to_be_visible()
+        await asyncio.gather(
+            expect(main_heading).to_be_visible(),
+            expect(links.first).to_be_visible(),
+        )
     
     @pytest.mark.asyncio
     async def test_text_content(self, page: Page):
@@ -47,20 +49,22 @@ class TestBasicOperations:
         """测试表单交互"""
         await page.goto("https://httpbin.org/forms/post")
         
+        # 定位器只创建一次，填写和断言共用
+        name_input = page.locator("input[name='custname']")
+        size_select = page.locator("select[name='size']")
+        
         # 填写表单字段
-        await page.fill("input[name='custname']", "测试用户")
-        await page.fill("input[name='custtel']", "13800138000")
-        await page.fill("input[name='custemail']", "test@example.com")
+        await name_input.fill("测试用户")
+        await page.locator("input[name='custtel']").fill("13800138000")
+        await page.locator("input[name='custemail']").fill("test@example.com")
         
         # 验证输入值
-        name_input = page.locator("input[name='custname']")
         await expect(name_input).to_have_value("测试用户")
         
         # 选择下拉选项
-        await page.select_option("select[name='size']", "large")
+        await size_select.select_option("large")
         
         # 验证选择
-        size_select = page.locator("select[name='size']")
         await expect(size_select).to_have_value("large")
     
     @pytest.mark.asyncio
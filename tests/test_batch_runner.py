@@ -0,0 +1,120 @@
+"""
+批量测试运行器测试用例
+测试输入行的校验和分组、进度日志和结果文件的写出
+"""
+import csv
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("xlsxwriter")
+
+# batch_runner 与 document_validator 同在 examples 目录下，按脚本方式导入
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+
+from batch_runner import BatchTestRunner, RESULT_COLUMNS
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    """在临时目录中创建的运行器，不启用文档校验"""
+    monkeypatch.chdir(tmp_path)
+    return BatchTestRunner("input.xlsx", output_file=str(tmp_path / "result.xlsx"))
+
+class TestInputRows:
+    """输入行校验和分组测试类"""
+    
+    def test_required_fields_mask(self, runner):
+        """测试必需字段为空或缺失的行被标记为无效，必需列转换为字符串"""
+        df = pd.DataFrame({
+            "url": ["https://a.example.com", None, "https://b.example.com", "https://a.example.com"],
+            "材料名称": ["体检合格证明", "身份证", "", 123],
+            "元素名称": ["空白表格", "示例样表", "空白表格", "示例样表"],
+        })
+        mask = runner._required_fields_mask(df)
+        
+        assert mask.tolist() == [True, False, False, True]
+        # 空值转为空字符串，数字转为字符串
+        assert df["url"][1] == ""
+        assert df["材料名称"][3] == "123"
+    
+    def test_group_positions_by_url(self, runner):
+        """测试同一URL的有效行分到一组，无效行不参与分组"""
+        df = pd.DataFrame({
+            "url": ["https://a.example.com", "https://b.example.com", "https://a.example.com",
+                    "https://b.example.com", ""],
+            "材料名称": ["甲", "乙", "丙", "", "戊"],
+            "元素名称": ["空白表格", "空白表格", "示例样表", "示例样表", "空白表格"],
+        })
+        groups = runner._group_positions_by_url(df, runner._required_fields_mask(df))
+        
+        assert {url: list(positions) for url, positions in groups.items()} == {
+            "https://a.example.com": [0, 2],
+            "https://b.example.com": [1],
+        }
+
+class TestProgressLog:
+    """进度日志测试类"""
+    
+    COLUMNS = ["url", "材料名称", "元素名称"] + RESULT_COLUMNS
+    
+    def _read_log(self, runner):
+        with open(runner.progress_file, newline="", encoding="utf-8-sig") as f:
+            return list(csv.reader(f))
+    
+    def _start(self, runner, count):
+        runner._input_rows = [[f"https://example.com/{i}", f"材料{i}", "空白表格"] for i in range(count)]
+        runner._open_progress_log(self.COLUMNS)
+    
+    def test_out_of_order_results_are_written_in_input_order(self, runner):
+        """测试乱序完成的结果按输入顺序写出，进度日志始终是结果的前缀"""
+        self._start(runner, 3)
+        try:
+            runner._record_progress(2, "成功", "第三行", "pdf", "t2")
+            assert self._read_log(runner)[1:] == []
+            
+            runner._record_progress(0, "失败", "第一行", "", "t0")
+            assert [row[1] for row in self._read_log(runner)[1:]] == ["材料0"]
+            
+            runner._record_progress(1, "成功", "第二行", "docx", "t1")
+            assert [row[1] for row in self._read_log(runner)[1:]] == ["材料0", "材料1", "材料2"]
+        finally:
+            runner._close_progress_log()
+        
+        rows = self._read_log(runner)
+        assert rows[0] == self.COLUMNS
+        assert rows[1][3:] == ["t0", "失败: 第一行", ""]
+        assert rows[3][3:] == ["t2", "成功: 第三行", "pdf"]
+    
+    def test_close_flushes_rows_still_waiting(self, runner):
+        """测试关闭时仍在等待前序行的结果也按位置顺序写出"""
+        self._start(runner, 4)
+        runner._record_progress(3, "成功", "", "", "t3")
+        runner._record_progress(1, "成功", "", "", "t1")
+        runner._close_progress_log()
+        
+        assert [row[1] for row in self._read_log(runner)[1:]] == ["材料1", "材料3"]
+
+class TestSaveWorkbook:
+    """结果文件写出测试类"""
+    
+    def test_datetime_column_round_trip(self, runner):
+        """测试日期时间列写出后仍是带格式的日期，空值写为空单元格"""
+        output_file = runner.output_file
+        
+        when = datetime(2024, 5, 6, 7, 8, 9)
+        df = pd.DataFrame({"材料名称": ["体检合格证明", "身份证"], "提交时间": [pd.Timestamp(when), pd.NaT]})
+        runner._save_workbook(list(df.columns), runner._frame_rows(df))
+        
+        # 单元格带日期格式，而不是裸的序列号
+        worksheet = openpyxl.load_workbook(output_file).active
+        assert worksheet["B2"].is_date
+        assert worksheet["B2"].number_format == "yyyy-mm-dd hh:mm:ss"
+        
+        result = pd.read_excel(output_file, engine="openpyxl")
+        assert list(result.columns) == ["材料名称", "提交时间"]
+        assert result["提交时间"][0] == when
+        assert pd.isna(result["提交时间"][1])
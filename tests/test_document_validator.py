@@ -0,0 +1,68 @@
+"""
+文档校验器测试用例
+测试模型响应的解析，不调用视觉模型
+"""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("openai")
+
+# document_validator 位于 examples 目录下，按脚本方式导入
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+
+from document_validator import DocumentValidator, ValidationResult
+
+@pytest.fixture
+def validator():
+    """解析响应不需要 OpenAI 客户端，跳过 __init__"""
+    return DocumentValidator.__new__(DocumentValidator)
+
+class TestParseValidationResponse:
+    """模型响应解析测试类"""
+    
+    @pytest.mark.asyncio
+    async def test_json_in_code_block_with_surrounding_text(self, validator):
+        """测试从 ```json 代码块和前后说明文字中提取JSON"""
+        content = """以下是校验结果：
+```json
+{
+  "forms_consistent": true,
+  "forms_consistent_reason": "布局一致",
+  "sample_info_masked": false,
+  "sample_info_masked_reason": "电话未打码"
+}
+```
+请参考。"""
+        result = ValidationResult()
+        await validator._parse_validation_response(result, content)
+        
+        assert result.forms_consistent is True
+        assert result.forms_consistent_reason == "布局一致"
+        assert result.sample_info_masked is False
+        assert result.sample_info_masked_reason == "电话未打码"
+        # 响应中没有的判断项保持未判断
+        assert result.blank_form_matches is None
+        assert result.blank_form_matches_reason == ""
+    
+    @pytest.mark.asyncio
+    async def test_missing_reason_defaults_to_empty(self, validator):
+        """测试只有判断没有理由时理由为空字符串"""
+        result = ValidationResult()
+        await validator._parse_validation_response(result, '{"blank_form_empty": true}')
+        
+        assert result.blank_form_empty is True
+        assert result.blank_form_empty_reason == ""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content", ["模型拒绝回答", '{"forms_consistent": tru'])
+    async def test_unparseable_response_sets_error_reasons(self, validator, content):
+        """测试无法解析时所有空的理由字段写入错误信息，判断项保持未判断"""
+        result = ValidationResult(forms_consistent_reason="已有理由")
+        await validator._parse_validation_response(result, content)
+        
+        assert result.forms_consistent is None
+        assert result.forms_consistent_reason == "已有理由"
+        assert result.sample_form_filled_reason.startswith("解析响应失败")
@@ -0,0 +1,49 @@
+"""
+下载脚本测试用例
+测试从响应中提取并清理文件名
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("httpx")
+
+# download_link 位于 examples 目录下，按脚本方式导入
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+
+from download_link import filename_from_response
+
+def fake_response(path: str, content_disposition: str = None):
+    headers = {"content-disposition": content_disposition} if content_disposition else {}
+    return SimpleNamespace(headers=headers, url=SimpleNamespace(path=path))
+
+class TestFilenameFromResponse:
+    """文件名提取测试类"""
+    
+    @pytest.mark.parametrize("header, expected", [
+        ('attachment; filename="form.docx"', "form.docx"),
+        ("attachment; filename=form.pdf", "form.pdf"),
+        ("attachment; filename*=UTF-8''%E4%BD%93%E6%A3%80%E8%A1%A8.docx", "体检表.docx"),
+    ])
+    def test_name_from_content_disposition(self, header, expected):
+        """测试从 Content-Disposition 中取文件名，支持 filename* 的百分号编码"""
+        assert filename_from_response(fake_response("/download", header), "空白表格") == expected
+    
+    def test_name_from_url_path(self):
+        """测试没有 Content-Disposition 时取URL路径的最后一段"""
+        response = fake_response("/files/%E7%A4%BA%E4%BE%8B.pdf")
+        assert filename_from_response(response, "示例样表") == "示例.pdf"
+    
+    @pytest.mark.parametrize("header", [
+        'attachment; filename="../../etc/passwd"',
+        "attachment; filename*=UTF-8''..%2F..%2Fetc%2Fpasswd",
+    ])
+    def test_directory_parts_are_removed(self, header):
+        """测试文件名中的目录部分被去掉，不能写到下载目录之外"""
+        assert filename_from_response(fake_response("/download", header), "空白表格") == "passwd"
+    
+    def test_fallback_when_no_name(self):
+        """测试取不到文件名时使用备用名称"""
+        assert filename_from_response(fake_response("/files/"), "空白表格") == "空白表格"
@@ -0,0 +1,108 @@
+"""
+辅助工具测试用例
+测试 NetworkHelper 的请求索引和筛选，使用模拟的页面和请求对象，不需要启动浏览器
+"""
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("playwright")
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import NetworkHelper
+
+class FakePage:
+    """只实现事件注册的模拟页面"""
+    
+    def __init__(self):
+        self.listeners = {}
+    
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+    
+    def remove_listener(self, event, callback):
+        self.listeners[event].remove(callback)
+    
+    def emit(self, event, payload):
+        for callback in list(self.listeners.get(event, ())):
+            callback(payload)
+
+def fake_request(url: str, method: str = "GET"):
+    return SimpleNamespace(url=url, method=method, headers={"accept": "*/*"})
+
+@pytest.fixture
+def page():
+    return FakePage()
+
+@pytest.fixture
+def network_helper(page, tmp_path):
+    helper = NetworkHelper(page, logs_dir=str(tmp_path))
+    yield helper
+    helper.close()
+
+class TestNetworkHelperIndexes:
+    """NetworkHelper 请求索引测试类"""
+    
+    URLS = [
+        ("https://a.example.com/1", "GET"),
+        ("https://example.com/login", "post"),
+        ("https://a.example.com/2", "GET"),
+        ("https://cdn.other.org/example.com/lib.js", "GET"),
+        ("http://b.example.com:8080/", "GET"),
+        ("data:image/png;base64,AAAA", "GET"),
+    ]
+    
+    def _send_all(self, page):
+        for url, method in self.URLS:
+            page.emit("request", fake_request(url, method))
+    
+    def test_domain_matches_hosts_and_subdomains_in_request_order(self, page, network_helper):
+        """测试多个主机名匹配时合并结果仍按请求顺序排列"""
+        self._send_all(page)
+        urls = [req["url"] for req in network_helper.get_requests_by_domain("example.com")]
+        assert urls == [
+            "https://a.example.com/1",
+            "https://example.com/login",
+            "https://a.example.com/2",
+            "http://b.example.com:8080/",
+        ]
+    
+    def test_domain_single_host(self, page, network_helper):
+        """测试只匹配一个主机名时返回该主机的全部请求"""
+        self._send_all(page)
+        urls = [req["url"] for req in network_helper.get_requests_by_domain("a.example.com")]
+        assert urls == ["https://a.example.com/1", "https://a.example.com/2"]
+    
+    def test_domain_does_not_match_path_or_scheme(self, page, network_helper):
+        """测试域名只与主机名匹配，路径和协议片段不会匹配"""
+        self._send_all(page)
+        assert network_helper.get_requests_by_domain("/lib.js") == []
+        assert network_helper.get_requests_by_domain("https:") == []
+        # 路径中出现的 example.com 不算该域名的请求
+        urls = [req["url"] for req in network_helper.get_requests_by_domain("other.org")]
+        assert urls == ["https://cdn.other.org/example.com/lib.js"]
+    
+    def test_method_is_case_insensitive(self, page, network_helper):
+        """测试按方法筛选不区分大小写"""
+        self._send_all(page)
+        assert [req["url"] for req in network_helper.get_requests_by_method("POST")] == ["https://example.com/login"]
+        assert len(network_helper.get_requests_by_method("get")) == 5
+        assert network_helper.get_requests_by_method("DELETE") == []
+    
+    def test_summary_skips_requests_without_host(self, page, network_helper, tmp_path):
+        """测试保存的日志中请求记录完整，data: 请求不计入域名数"""
+        self._send_all(page)
+        page.emit("response", SimpleNamespace(url="https://example.com/login", status=200, headers={}))
+        data = json.loads(open(network_helper.save_network_logs("network.json"), encoding="utf-8").read())
+        
+        assert [req["url"] for req in data["requests"]] == [url for url, _ in self.URLS]
+        assert data["responses"][0]["status"] == 200
+        assert data["summary"] == {"total_requests": 6, "total_responses": 1, "unique_domains": 4}
+        # 保存后不再记录
+        page.emit("request", fake_request("https://example.com/late"))
+        assert len(network_helper.req_urls) == 6
@@ -0,0 +1,71 @@
+"""
+校验结果缓存测试用例
+测试缓存键、有效期和原子写入
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# validation_cache 位于 examples 目录下，按脚本方式导入
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+
+import validation_cache
+from validation_cache import check_cache, make_cache_key, save_to_cache
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """缓存写入临时目录"""
+    path = tmp_path / "cache"
+    monkeypatch.setattr(validation_cache, "CACHE_DIR", str(path))
+    return path
+
+class TestCacheKey:
+    """缓存键测试类"""
+    
+    def test_key_depends_on_content_not_path(self, tmp_path):
+        """测试内容相同的文件得到相同的键，内容或提示词版本变化时键随之变化"""
+        first = tmp_path / "a.docx"
+        second = tmp_path / "b.docx"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+        
+        key = make_cache_key("体检合格证明", "v1", str(first), None)
+        assert make_cache_key("体检合格证明", "v1", str(second), None) == key
+        assert make_cache_key("体检合格证明", "v2", str(first), None) != key
+        # 缺失的文档所在位置也参与计算
+        assert make_cache_key("体检合格证明", "v1", None, str(first)) != key
+        
+        second.write_bytes(b"changed")
+        assert make_cache_key("体检合格证明", "v1", str(second), None) != key
+
+class TestCacheEntries:
+    """缓存读写测试类"""
+    
+    def test_round_trip(self):
+        """测试写入后可读出相同的值"""
+        save_to_cache("key", {"forms_consistent": True, "forms_consistent_reason": "一致"})
+        assert check_cache("key") == {"forms_consistent": True, "forms_consistent_reason": "一致"}
+    
+    def test_expired_entry_is_ignored(self):
+        """测试超过有效期的缓存视为不存在"""
+        save_to_cache("key", {"forms_consistent": True}, ttl=-1)
+        assert check_cache("key") is None
+    
+    def test_missing_or_corrupt_entry_is_ignored(self, cache_dir):
+        """测试不存在或损坏的缓存文件视为不存在"""
+        assert check_cache("missing") is None
+        
+        cache_dir.mkdir()
+        (cache_dir / "broken.json").write_text('{"expires_at": ', encoding="utf-8")
+        assert check_cache("broken") is None
+    
+    def test_write_replaces_entry_without_leaving_temp_files(self, cache_dir):
+        """测试重复写入同一个键时整体替换，不留下临时文件"""
+        save_to_cache("key", {"value": 1})
+        save_to_cache("key", {"value": 2})
+        
+        assert os.listdir(cache_dir) == ["key.json"]
+        with open(cache_dir / "key.json", encoding="utf-8") as f:
+            assert json.load(f)["value"] == {"value": 2}
@@ -3,11 +3,96 @@ Playwright 工具函数
 提供常用的辅助功能
 """
 import asyncio
+import itertools
 import json
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from playwright.async_api import Page, Browser, BrowserContext
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Any
+from playwright.async_api import Page, Browser, BrowserContext, Playwright, async_playwright
+
+try:
+    import orjson
+
+    def _dumps(obj, indent: bool = False) -> bytes:
+        """序列化为 JSON（UTF-8 字节）"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:  # 未安装 orjson 时退回标准库
+    def _dumps(obj, indent: bool = False) -> bytes:
+        """序列化为 JSON（UTF-8 字节）"""
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+# 默认文件名使用本次运行的标识加递增序号，不必每次格式化当前时间，同一秒内生成的文件也不会重名
+_RUN_ID = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+_file_counter = itertools.count(1)
+
+# 滚动脚本为固定文本，滚动距离作为参数传入
+_SCROLL_BY = "(pixels) => window.scrollBy(0, pixels)"
+_SCROLL_TO_TOP = "() => window.scrollTo(0, 0)"
+_SCROLL_TO_BOTTOM = "() => window.scrollTo(0, document.body.scrollHeight)"
+
+# 页面信息脚本通过 add_init_script 注册到每个文档的 window.__pwHelper，
+# 之后每次获取只需发送一行调用；getElementsByTagName 只读取集合长度，不需要生成节点列表
+_PAGE_HELPER_JS = """
+window.__pwHelper = window.__pwHelper || {
+    getPageInfo() {
+        const count = (tag) => document.getElementsByTagName(tag).length;
+        return {
+            title: document.title,
+            url: window.location.href,
+            userAgent: navigator.userAgent,
+            viewport: {
+                width: window.innerWidth,
+                height: window.innerHeight
+            },
+            elementsCount: {
+                links: count('a'),
+                images: count('img'),
+                forms: count('form'),
+                inputs: count('input')
+            },
+            loadTime: performance.now()
+        };
+    }
+};
+"""
+_GET_PAGE_INFO_JS = "() => window.__pwHelper ? window.__pwHelper.getPageInfo() : null"
+# 注册前已加载的文档没有 window.__pwHelper，在当前文档中定义后再获取
+_INSTALL_AND_GET_PAGE_INFO_JS = f"() => {{ {_PAGE_HELPER_JS} return window.__pwHelper.getPageInfo(); }}"
+
+def _ensure_dir(path: str):
+    """创建输出目录；每次写入前检查，切换工作目录或目录被删除后也能正常写入"""
+    os.makedirs(path, exist_ok=True)
+
+# 网络事件的时间戳记为相对该时刻的单调纳秒数，保存日志时换算为时间
+_START_NS = time.monotonic_ns()
+_START_TIME = time.time()
+
+def _default_filename(prefix: str, extension: str) -> str:
+    """生成默认文件名"""
+    return f"{prefix}_{_RUN_ID}_{next(_file_counter):05d}.{extension}"
+
+# 模块内共享的 Playwright 实例，首次使用时启动，所有工厂函数共用同一个驱动进程
+_pw_instance: Optional[Playwright] = None
+_pw_lock = asyncio.Lock()
+
+async def _get_playwright() -> Playwright:
+    """获取共享的 Playwright 实例，不存在时启动"""
+    global _pw_instance
+    async with _pw_lock:
+        if _pw_instance is None:
+            _pw_instance = await async_playwright().start()
+        return _pw_instance
+
+async def shutdown_playwright():
+    """关闭浏览器池中的浏览器并停止共享的 Playwright 实例，之后再次使用工厂函数时会重新启动"""
+    global _pw_instance
+    await _pool.release_all()
+    async with _pw_lock:
+        if _pw_instance is not None:
+            await _pw_instance.stop()
+            _pw_instance = None
 
 class PlaywrightHelper:
     """Playwright 辅助工具类"""
@@ -16,18 +101,22 @@ class PlaywrightHelper:
         self.page = page
         self.screenshots_dir = "screenshots"
         self.logs_dir = "logs"
-        self._ensure_directories()
+        # 页面信息脚本是否已通过 add_init_script 注册
+        self._helper_script_installed = False
     
-    def _ensure_directories(self):
-        """确保目录存在"""
-        os.makedirs(self.screenshots_dir, exist_ok=True)
-        os.makedirs(self.logs_dir, exist_ok=True)
-    
-    async def safe_goto(self, url: str, timeout: int = 30000) -> bool:
-        """安全地访问页面"""
+    async def safe_goto(
+        self,
+        url: str,
+        timeout: int = 30000,
+        wait_until: Literal["commit", "domcontentloaded", "load", "networkidle"] = "load"
+    ) -> bool:
+        """
+        安全地访问页面
+        
+        默认等待 load 事件；页面内容依赖后续异步请求时可传 wait_until="networkidle"
+        """
         try:
-            await self.page.goto(url, timeout=timeout)
-            await self.page.wait_for_load_state("networkidle")
+            await self.page.goto(url, timeout=timeout, wait_until=wait_until)
             return True
         except Exception as e:
             print(f"访问页面失败: {url}, 错误: {e}")
@@ -53,6 +142,37 @@ class PlaywrightHelper:
             print(f"填写表单失败: {selector}, 错误: {e}")
             return False
     
+    async def safe_fill_many(self, fields: Dict[str, str], timeout: int = 10000) -> bool:
+        """
+        填写多个表单字段，与逐个调用 safe_fill 的行为相同
+        
+        所有字段的等待同时进行，总等待时间取决于最慢的字段而不是各字段之和；
+        填写会聚焦元素，仍按顺序逐个执行，由 Playwright 完成可操作性检查并触发输入事件
+        
+        Args:
+            fields: {选择器: 填写内容}
+            timeout: 等待每个元素出现的超时时间（毫秒）
+            
+        Returns:
+            bool: 所有字段均找到并填写时为 True
+        """
+        waits = await asyncio.gather(
+            *(self.page.wait_for_selector(selector, timeout=timeout) for selector in fields),
+            return_exceptions=True
+        )
+        missing = [selector for selector, result in zip(fields, waits) if isinstance(result, Exception)]
+        if missing:
+            print(f"填写表单失败: 未找到元素 {missing}")
+            return False
+        
+        for selector, text in fields.items():
+            try:
+                await self.page.fill(selector, text)
+            except Exception as e:
+                print(f"填写表单失败: {selector}, 错误: {e}")
+                return False
+        return True
+    
     async def wait_for_element(self, selector: str, timeout: int = 10000) -> bool:
         """等待元素出现"""
         try:
@@ -88,8 +208,9 @@ class PlaywrightHelper:
     async def take_screenshot(self, name: str = None, full_page: bool = True) -> str:
         """截图"""
         if name is None:
-            name = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            name = _default_filename("screenshot", "png")
         
+        _ensure_dir(self.screenshots_dir)
         filepath = os.path.join(self.screenshots_dir, name)
         await self.page.screenshot(path=filepath, full_page=full_page)
         return filepath
@@ -98,8 +219,9 @@ class PlaywrightHelper:
         """元素截图"""
         try:
             if name is None:
-                name = f"element_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                name = _default_filename("element", "png")
             
+            _ensure_dir(self.screenshots_dir)
             filepath = os.path.join(self.screenshots_dir, name)
             element = self.page.locator(selector)
             await element.screenshot(path=filepath)
@@ -109,27 +231,21 @@ class PlaywrightHelper:
             return None
     
     async def get_page_info(self) -> Dict[str, Any]:
-        """获取页面信息"""
-        return await self.page.evaluate("""
-            () => {
-                return {
-                    title: document.title,
-                    url: window.location.href,
-                    userAgent: navigator.userAgent,
-                    viewport: {
-                        width: window.innerWidth,
-                        height: window.innerHeight
-                    },
-                    elementsCount: {
-                        links: document.querySelectorAll('a').length,
-                        images: document.querySelectorAll('img').length,
-                        forms: document.querySelectorAll('form').length,
-                        inputs: document.querySelectorAll('input').length
-                    },
-                    loadTime: performance.now()
-                };
-            }
-        """)
+        """
+        获取页面信息
+        
+        每次调用都在页面中重新读取，视口大小、元素数量和 loadTime 反映调用时的页面状态
+        """
+        if not self._helper_script_installed:
+            # 首次调用时注册初始化脚本，之后加载的文档都会带有 window.__pwHelper；
+            # 当前文档在这次调用中直接定义
+            await self.page.add_init_script(_PAGE_HELPER_JS)
+            self._helper_script_installed = True
+            return await self.page.evaluate(_INSTALL_AND_GET_PAGE_INFO_JS)
+        return (
+            await self.page.evaluate(_GET_PAGE_INFO_JS)
+            or await self.page.evaluate(_INSTALL_AND_GET_PAGE_INFO_JS)
+        )
     
     async def scroll_to_element(self, selector: str) -> bool:
         """滚动到元素"""
@@ -142,15 +258,16 @@ class PlaywrightHelper:
     
     async def scroll_page(self, direction: str = "down", pixels: int = 500) -> bool:
         """滚动页面"""
+        direction = direction.lower()
         try:
-            if direction.lower() == "down":
-                await self.page.evaluate(f"window.scrollBy(0, {pixels})")
-            elif direction.lower() == "up":
-                await self.page.evaluate(f"window.scrollBy(0, -{pixels})")
-            elif direction.lower() == "top":
-                await self.page.evaluate("window.scrollTo(0, 0)")
-            elif direction.lower() == "bottom":
-                await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            if direction == "down":
+                await self.page.evaluate(_SCROLL_BY, pixels)
+            elif direction == "up":
+                await self.page.evaluate(_SCROLL_BY, -pixels)
+            elif direction == "top":
+                await self.page.evaluate(_SCROLL_TO_TOP)
+            elif direction == "bottom":
+                await self.page.evaluate(_SCROLL_TO_BOTTOM)
             return True
         except Exception:
             return False
@@ -158,123 +275,316 @@ class PlaywrightHelper:
     async def save_page_source(self, filename: str = None) -> str:
         """保存页面源码"""
         if filename is None:
-            filename = f"page_source_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+            filename = _default_filename("page_source", "html")
         
+        _ensure_dir(self.logs_dir)
         filepath = os.path.join(self.logs_dir, filename)
         content = await self.page.content()
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # 大页面的源码写入在线程中进行，不阻塞事件循环
+        await asyncio.to_thread(Path(filepath).write_text, content, encoding='utf-8')
         
         return filepath
     
     async def save_console_logs(self, filename: str = None) -> str:
         """保存控制台日志"""
         if filename is None:
-            filename = f"console_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = _default_filename("console_logs", "json")
         
+        _ensure_dir(self.logs_dir)
         filepath = os.path.join(self.logs_dir, filename)
         
         # 注意: 这需要在页面加载前设置监听器
         # 在实际使用中，应该在创建Helper时就设置
         logs = []
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(_dumps(logs, indent=True))
         
         return filepath
 
 class NetworkHelper:
-    """网络相关辅助工具"""
+    """
+    网络相关辅助工具
     
-    def __init__(self, page: Page):
+    内存中只按列保存请求的 URL、方法和时间，完整的请求/响应逐条追加写入 JSONL 文件，
+    事件文件在收到第一个事件时才打开。record_headers=False 时事件记录不含请求头/响应头，
+    监听器中不再读取和复制头部。
+    
+    使用完毕后调用 save_network_logs() 或 close() 停止记录，也可以用作异步上下文管理器：
+        async with NetworkHelper(page) as network_helper:
+            ...
+    """
+    
+    def __init__(self, page: Page, logs_dir: str = "logs", record_headers: bool = True):
         self.page = page
-        self.requests = []
-        self.responses = []
+        self.logs_dir = logs_dir
+        self.record_headers = record_headers
+        # 请求按列存储，筛选时直接扫描列表
+        self.req_urls: List[str] = []
+        self.req_methods: List[str] = []
+        # 相对 _START_NS 的单调纳秒数
+        self.req_ts: List[int] = []
+        # 按主机名和方法建立的请求下标索引，筛选时无需扫描全部请求
+        self._by_host: Dict[str, List[int]] = {}
+        self._by_method: Dict[str, List[int]] = {}
+        self.response_count = 0
         self._setup_listeners()
     
     def _setup_listeners(self):
-        """设置网络监听器"""
+        """设置网络监听器，并打开记录完整事件的 JSONL 文件"""
+        _ensure_dir(self.logs_dir)
+        self.events_path = os.path.join(self.logs_dir, _default_filename("network_events", "jsonl"))
+        self._events_file = None
+        self._closed = False
         self.page.on("request", self._handle_request)
         self.page.on("response", self._handle_response)
     
+    def _write_event(self, event: Dict[str, Any]):
+        """追加一条事件记录，第一次写入时打开事件文件"""
+        if self._events_file is None:
+            self._events_file = open(self.events_path, "ab")
+        self._events_file.write(_dumps(event) + b"\n")
+    
+    def close(self):
+        """停止记录：移除页面监听器并关闭事件文件，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        self.page.remove_listener("request", self._handle_request)
+        self.page.remove_listener("response", self._handle_response)
+        if self._events_file is not None:
+            self._events_file.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+    
     def _handle_request(self, request):
         """处理请求"""
-        self.requests.append({
-            "url": request.url,
-            "method": request.method,
-            "headers": dict(request.headers),
-            "timestamp": datetime.now().isoformat()
-        })
+        timestamp = time.monotonic_ns() - _START_NS
+        index = len(self.req_urls)
+        method = request.method.upper()
+        # 取 "://" 之后、第一个 "/" 之前的部分作为主机名，不必构造 urlparse 结果对象
+        host = request.url.partition("://")[2].partition("/")[0]
+        self.req_urls.append(request.url)
+        self.req_methods.append(method)
+        self.req_ts.append(timestamp)
+        self._by_host.setdefault(host, []).append(index)
+        self._by_method.setdefault(method, []).append(index)
+        event = {"type": "request", "url": request.url, "method": request.method, "timestamp": timestamp}
+        if self.record_headers:
+            # headers 属性每次访问都会生成新的字典，直接写出，不再额外复制
+            event["headers"] = request.headers
+        self._write_event(event)
     
     def _handle_response(self, response):
         """处理响应"""
-        self.responses.append({
+        self.response_count += 1
+        event = {
+            "type": "response",
             "url": response.url,
             "status": response.status,
-            "headers": dict(response.headers),
-            "timestamp": datetime.now().isoformat()
-        })
+            "timestamp": time.monotonic_ns() - _START_NS
+        }
+        if self.record_headers:
+            event["headers"] = response.headers
+        self._write_event(event)
+    
+    @staticmethod
+    def _format_timestamp(elapsed_ns: int) -> str:
+        """将相对的单调纳秒数换算为 ISO 格式时间"""
+        return datetime.fromtimestamp(_START_TIME + elapsed_ns / 1e9).isoformat()
+    
+    def _requests_at(self, indexes) -> List[Dict]:
+        """按下标组装请求记录"""
+        return [
+            {
+                "url": self.req_urls[i],
+                "method": self.req_methods[i],
+                "timestamp": self._format_timestamp(self.req_ts[i])
+            }
+            for i in indexes
+        ]
     
     def get_requests_by_domain(self, domain: str) -> List[Dict]:
-        """根据域名筛选请求"""
-        return [req for req in self.requests if domain in req["url"]]
+        """
+        根据域名筛选请求，主机名包含该域名（含子域名）的请求均会返回，结果按请求顺序排列
+        
+        只匹配主机名（含端口），不再匹配完整 URL：传入路径或协议片段（如 "/api"、"https:"）不会匹配任何请求，
+        按路径筛选请直接扫描 req_urls
+        """
+        # 只需扫描主机名（数量远少于请求数）；匹配到多个主机名时合并后按请求顺序返回
+        matched = [indexes for host, indexes in self._by_host.items() if domain in host]
+        if len(matched) == 1:
+            return self._requests_at(matched[0])
+        return self._requests_at(sorted(i for indexes in matched for i in indexes))
     
     def get_requests_by_method(self, method: str) -> List[Dict]:
         """根据方法筛选请求"""
-        return [req for req in self.requests if req["method"].upper() == method.upper()]
+        return self._requests_at(self._by_method.get(method.upper(), ()))
+    
+    def _iter_events(self, event_type: str):
+        """按写入顺序读取事件文件中指定类型的事件，转换为旧版日志中的记录格式"""
+        if self._events_file is None:
+            return
+        with open(self.events_path, "rb") as f:
+            for line in f:
+                event = json.loads(line)
+                if event.pop("type") != event_type:
+                    continue
+                event["timestamp"] = self._format_timestamp(event["timestamp"])
+                yield event
+    
+    def _write_records(self, f, event_type: str):
+        """把一类事件逐条写成 JSON 数组，不必一次读入内存"""
+        f.write(b"[")
+        for i, record in enumerate(self._iter_events(event_type)):
+            f.write((b",\n    " if i else b"\n    ") + _dumps(record))
+        f.write(b"\n  ]")
     
     def save_network_logs(self, filename: str = None) -> str:
-        """保存网络日志"""
+        """
+        停止记录并保存网络日志
+        
+        日志格式与之前相同（requests、responses、summary），记录从事件文件中逐条读出写入；
+        另外附带事件文件路径 events_file 和事件时间戳的基准时间 events_started_at
+        """
         if filename is None:
-            filename = f"network_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = _default_filename("network_logs", "json")
         
-        logs_dir = "logs"
-        os.makedirs(logs_dir, exist_ok=True)
-        filepath = os.path.join(logs_dir, filename)
+        _ensure_dir(self.logs_dir)
+        filepath = os.path.join(self.logs_dir, filename)
         
-        data = {
-            "requests": self.requests,
-            "responses": self.responses,
-            "summary": {
-                "total_requests": len(self.requests),
-                "total_responses": len(self.responses),
-                "unique_domains": len(set(req["url"].split("/")[2] for req in self.requests if len(req["url"].split("/")) > 2))
-            }
+        self.close()
+        
+        summary = {
+            "total_requests": len(self.req_urls),
+            "total_responses": self.response_count,
+            # 主机名索引的键即为访问过的域名；data: 等没有主机名的请求不计入
+            "unique_domains": sum(1 for host in self._by_host if host)
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(b'{\n  "requests": ')
+            self._write_records(f, "request")
+            f.write(b',\n  "responses": ')
+            self._write_records(f, "response")
+            f.write(b',\n  "summary": ' + _dumps(summary))
+            f.write(b',\n  "events_file": ' + _dumps(self.events_path))
+            # 事件文件中的 timestamp 为相对该时间的纳秒数
+            f.write(b',\n  "events_started_at": ' + _dumps(self._format_timestamp(0)))
+            f.write(b'\n}\n')
         
         return filepath
 
-async def create_browser_with_options(browser_type: str = "chromium", headless: bool = True, **kwargs) -> Browser:
-    """创建带选项的浏览器"""
-    from playwright.async_api import async_playwright
-    
-    p = await async_playwright().start()
-    
-    if browser_type.lower() == "chromium":
-        browser = await p.chromium.launch(headless=headless, **kwargs)
-    elif browser_type.lower() == "firefox":
-        browser = await p.firefox.launch(headless=headless, **kwargs)
-    elif browser_type.lower() == "webkit":
-        browser = await p.webkit.launch(headless=headless, **kwargs)
-    else:
-        raise ValueError(f"不支持的浏览器类型: {browser_type}")
-    
-    return browser
+class PersistentBrowser:
+    """
+    持久化上下文的包装，提供与 Browser 相同的 new_page/close/is_connected 接口
+    
+    持久化上下文使用固定的用户数据目录，HTTP 缓存在多次运行之间保留。
+    注意不要在其页面上注册 route 拦截，拦截会使 HTTP 缓存失效。
+    """
+    
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self._connected = True
+        context.on("close", self._handle_close)
+    
+    def _handle_close(self, _context):
+        self._connected = False
+    
+    def is_connected(self) -> bool:
+        return self._connected
+    
+    async def new_page(self) -> Page:
+        return await self.context.new_page()
+    
+    async def close(self):
+        await self.context.close()
+
+class BrowserPool:
+    """按启动参数缓存浏览器，相同参数的调用共用一个已启动的浏览器"""
+    
+    def __init__(self):
+        self._browsers: Dict[tuple, Browser] = {}
+        self._lock = asyncio.Lock()
+    
+    @staticmethod
+    def _make_key(browser_type: str, headless: bool, kwargs: Dict[str, Any]) -> tuple:
+        """由启动参数生成缓存键，参数值可能是列表等不可哈希类型，统一序列化为字符串"""
+        return (browser_type, headless, json.dumps(kwargs, sort_keys=True, default=str))
+    
+    async def acquire(self, browser_type: str = "chromium", headless: bool = True,
+                      cache_dir: Optional[str] = None, **kwargs) -> Browser:
+        """
+        获取指定参数的浏览器，尚未启动或已被关闭时重新启动
+        
+        指定 cache_dir 时以该目录启动持久化上下文并返回 PersistentBrowser，
+        同一目录只能被一个浏览器进程使用，因此同样按参数缓存
+        """
+        browser_type = browser_type.lower()
+        if browser_type not in ("chromium", "firefox", "webkit"):
+            raise ValueError(f"不支持的浏览器类型: {browser_type}")
+        
+        key = self._make_key(browser_type, headless, {**kwargs, "cache_dir": cache_dir})
+        async with self._lock:
+            browser = self._browsers.get(key)
+            if browser is None or not browser.is_connected():
+                launcher = getattr(await _get_playwright(), browser_type)
+                if cache_dir:
+                    browser = PersistentBrowser(
+                        await launcher.launch_persistent_context(cache_dir, headless=headless, **kwargs)
+                    )
+                else:
+                    browser = await launcher.launch(headless=headless, **kwargs)
+                self._browsers[key] = browser
+            return browser
+    
+    async def release_all(self):
+        """关闭池中所有浏览器"""
+        async with self._lock:
+            browsers = list(self._browsers.values())
+            self._browsers.clear()
+        for browser in browsers:
+            if browser.is_connected():
+                await browser.close()
 
-async def create_mobile_context(browser: Browser, device_name: str = "iPhone 12") -> BrowserContext:
-    """创建移动设备上下文"""
-    from playwright.async_api import async_playwright
+_pool = BrowserPool()
+
+async def create_browser_with_options(browser_type: str = "chromium", headless: bool = True,
+                                      cache_dir: Optional[str] = None, **kwargs) -> Browser:
+    """
+    创建带选项的浏览器，相同参数的调用复用浏览器池中已启动的浏览器
+    
+    返回的浏览器由所有相同参数的调用方共用，调用方不应调用其 close()，
+    只需关闭自己创建的上下文；全部使用完毕后调用 shutdown_playwright() 统一关闭。
     
-    p = await async_playwright().start()
+    指定 cache_dir 时使用持久化上下文，静态资源的 HTTP 缓存在多次运行之间保留；
+    返回的对象只提供 new_page/close，不能再创建新的上下文
+    """
+    return await _pool.acquire(browser_type, headless, cache_dir, **kwargs)
+
+async def create_mobile_context(browser: Optional[Browser], device_name: str = "iPhone 12",
+                                cache_dir: Optional[str] = None, headless: bool = True) -> BrowserContext:
+    """
+    创建移动设备上下文
+    
+    指定 cache_dir 时忽略 browser，按设备参数启动持久化上下文，HTTP 缓存在多次运行之间保留
+    """
+    p = await _get_playwright()
     device = p.devices.get(device_name)
     
     if not device:
         raise ValueError(f"不支持的设备: {device_name}")
     
+    if cache_dir:
+        device = dict(device)
+        browser_type = device.pop("default_browser_type", "chromium")
+        return await getattr(p, browser_type).launch_persistent_context(cache_dir, headless=headless, **device)
+    
     return await browser.new_context(**device)
 
 